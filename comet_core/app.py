@@ -20,9 +20,14 @@ from datetime import datetime, timedelta
 
 from comet_core.data_store import DataStore
 from comet_core.exceptions import CometCouldNotSendException
-from comet_core.fingerprint import comet_event_fingerprint
+from comet_core.fingerprint import HASH_ALGORITHMS, JSON, ORJSON, SERIALIZERS, SHAKE_256, comet_event_fingerprint
 from comet_core.model import EventRecord
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 LOG = logging.getLogger(__name__)
 
 
@@ -32,13 +37,20 @@ class EventContainer:
     Args:
         source_type (str): the source type of the message
         message (dict): the message data
+        fingerprint_hash_algorithm (str): hash algorithm used for the default fingerprint
+        fingerprint_serializer (str): serializer used for the default fingerprint
     """
 
-    def __init__(self, source_type, message):
+    def __init__(self, source_type, message, fingerprint_hash_algorithm=SHAKE_256, fingerprint_serializer=JSON):
         self.source_type = source_type
         self.message = message
         self.owner = None
-        self.fingerprint = comet_event_fingerprint(data_dict=message, prefix=source_type + "_")
+        self.fingerprint = comet_event_fingerprint(
+            data_dict=message,
+            prefix=source_type + "_",
+            algorithm=fingerprint_hash_algorithm,
+            serializer=fingerprint_serializer,
+        )
         self.event_metadata = dict()
 
     def get_record(self):
@@ -137,11 +149,29 @@ class Comet:
 
     Args:
         database_uri (str): the database to connect to as an URI
+        fingerprint_hash_algorithm (str): hash algorithm for event fingerprints, one of
+            comet_core.fingerprint.HASH_ALGORITHMS. Changing it changes the fingerprint of every event.
+        fingerprint_serializer (str): serializer for the data that is fingerprinted, one of
+            comet_core.fingerprint.SERIALIZERS. Changing it changes the fingerprint of every event.
+        data_store (comet_core.data_store.DataStore): an existing data store to use instead of connecting to
+            database_uri, e.g. to share one engine between several instances
     """
 
-    def __init__(self, database_uri="sqlite://"):
+    def __init__(
+        self,
+        database_uri="sqlite://",
+        fingerprint_hash_algorithm=SHAKE_256,
+        fingerprint_serializer=JSON,
+        data_store=None,
+    ):
+        if fingerprint_hash_algorithm not in HASH_ALGORITHMS:
+            raise ValueError(f"unsupported fingerprint hash algorithm {fingerprint_hash_algorithm!r}")
+        if fingerprint_serializer not in SERIALIZERS:
+            raise ValueError(f"unsupported fingerprint serializer {fingerprint_serializer!r}")
+        if fingerprint_serializer == ORJSON and orjson is None:
+            raise ValueError("the orjson serializer requires the orjson package to be installed")
         self.running = False
-        self.data_store = DataStore(database_uri)
+        self.data_store = data_store if data_store is not None else DataStore(database_uri)
 
         self.inputs = list()
         self.instantiated_inputs = list()
@@ -154,6 +184,8 @@ class Comet:
         self.real_time_config_providers = dict()
 
         self.database_uri = database_uri
+        self.fingerprint_hash_algorithm = fingerprint_hash_algorithm
+        self.fingerprint_serializer = fingerprint_serializer
         self.batch_config = {
             "communication_digest_mode": True,
             # By default (communication_digest_mode=True), all batch events will be grouped by an owner and source_type.
@@ -199,7 +231,7 @@ class Comet:
             return False
 
         # Prepare an event container
-        event = EventContainer(source_type, message_dict)
+        event = EventContainer(source_type, message_dict, self.fingerprint_hash_algorithm, self.fingerprint_serializer)
 
         # Hydrate
         hydrate = self.hydrators.get(source_type)
@@ -272,6 +304,14 @@ class Comet:
 
         self.parsers[source_type] = func
 
+    def register_parsers(self, parsers):
+        """Register several parser functions at once.
+
+        Args:
+            parsers (dict): mapping of source type to the function that parses messages of that type
+        """
+        self.parsers.update(parsers)
+
     def register_config_provider(self, source_type, func=None):
         """Register, per source type, a function that return config given a real time event.
 
@@ -424,11 +464,12 @@ class Comet:
             events_by_owner = {}
             ignored_events = []
             need_escalation_events = []
+            ignored_fingerprints = self.data_store.get_ignored_fingerprints([e.fingerprint for e in batch_events])
 
             if source_type in self.real_time_sources:
                 real_time_events_by_owner = {}
                 for event in batch_events:
-                    if self.data_store.fingerprint_is_ignored(event.fingerprint):
+                    if event.fingerprint in ignored_fingerprints:
                         ignored_events.append(event)
                     else:
                         real_time_events_by_owner.setdefault(event.owner, []).append(event)
@@ -440,17 +481,24 @@ class Comet:
 
             else:
                 # Group events by owner and mark them as new or seen before
-                for event in batch_events:
-                    if self.data_store.fingerprint_is_ignored(event.fingerprint):
-                        ignored_events.append(event)
-                    else:
-                        event.new = self.data_store.check_if_new(event.fingerprint, source_type_config["new_threshold"])
-                        event.needs_escalation = False
-                        if self.data_store.check_needs_escalation(source_type_config["escalation_time"], event):
-                            event.needs_escalation = True
-                            event.first_escalation = not self.data_store.check_if_previously_escalated(event)
-                            need_escalation_events.append(event)
-                        events_by_owner.setdefault(event.owner, []).append(event)
+                ignored_events = [e for e in batch_events if e.fingerprint in ignored_fingerprints]
+                candidate_events = [e for e in batch_events if e.fingerprint not in ignored_fingerprints]
+                candidate_fps = [e.fingerprint for e in candidate_events]
+                new_by_fp = self.data_store.check_if_new_bulk(candidate_fps, source_type_config["new_threshold"])
+                needs_escalation_by_fp = self.data_store.check_needs_escalation_bulk(
+                    source_type_config["escalation_time"], candidate_events
+                )
+                escalated_fps = self.data_store.get_previously_escalated_fingerprints(
+                    [fp for fp in candidate_fps if needs_escalation_by_fp[fp]]
+                )
+                for event in candidate_events:
+                    event.new = new_by_fp[event.fingerprint]
+                    event.needs_escalation = False
+                    if needs_escalation_by_fp[event.fingerprint]:
+                        event.needs_escalation = True
+                        event.first_escalation = event.fingerprint not in escalated_fps
+                        need_escalation_events.append(event)
+                    events_by_owner.setdefault(event.owner, []).append(event)
 
             if ignored_events:
                 self.data_store.update_processed_at_timestamp_to_now(ignored_events)
@@ -15,13 +15,130 @@
 """Data Store module - interface to database."""
 
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, TypeVar
 
 import sqlalchemy
 import sqlalchemy.orm
+from sqlalchemy.sql.elements import ColumnElement
 
 from comet_core.model import BaseRecord, EventRecord, IgnoreFingerprintRecord
 
+# Upper bound for the number of values passed to a single `IN (...)` clause.
+IN_CLAUSE_CHUNK_SIZE = 1000
+
+# Events received within this window count as open issues.
+_OPEN_ISSUE_WINDOW = timedelta(days=1)
+
+T = TypeVar("T")
+
+
+class IgnoreFingerprint(NamedTuple):
+    """A fingerprint to ignore with `DataStore.ignore_event_fingerprints`, see `DataStore.ignore_event_fingerprint`."""
+
+    fingerprint: str
+    ignore_type: str
+    expires_at: Optional[datetime] = None
+    reported_at: Optional[datetime] = None
+    record_metadata: Optional[Dict[str, Any]] = None
+
+
+# Hot per-fingerprint lookups are built once as lambda statements so SQLAlchemy can reuse the compiled SQL and only
+# has to process the bound parameters on each call.
+_OLDEST_EVENT_WITH_FINGERPRINT = sqlalchemy.lambda_stmt(
+    lambda: sqlalchemy.select(EventRecord)
+    .where(EventRecord.fingerprint == sqlalchemy.bindparam("fingerprint"))
+    .order_by(EventRecord.received_at.asc())
+    .limit(1)
+)
+_LATEST_EVENT_WITH_FINGERPRINT = sqlalchemy.lambda_stmt(
+    lambda: sqlalchemy.select(EventRecord)
+    .where(EventRecord.fingerprint == sqlalchemy.bindparam("fingerprint"))
+    .order_by(EventRecord.received_at.desc())
+    .limit(1)
+)
+_OLDEST_RECEIVED_AT_WITH_FINGERPRINT = sqlalchemy.lambda_stmt(
+    lambda: sqlalchemy.select(sqlalchemy.func.min(EventRecord.received_at)).where(
+        EventRecord.fingerprint == sqlalchemy.bindparam("fingerprint")
+    )
+)
+_LATEST_PROCESSED_RECEIVED_AT = sqlalchemy.lambda_stmt(
+    lambda: sqlalchemy.select(EventRecord.received_at)
+    .where(EventRecord.fingerprint == sqlalchemy.bindparam("fingerprint"))
+    .where(EventRecord.processed_at.isnot(None))
+    .order_by(EventRecord.received_at.desc())
+    .limit(1)
+)
+# Existence checks use EXISTS so the database can stop at the first matching row.
+_FINGERPRINT_IS_IGNORED = sqlalchemy.lambda_stmt(
+    lambda: sqlalchemy.select(
+        sqlalchemy.exists()
+        .where(IgnoreFingerprintRecord.fingerprint == sqlalchemy.bindparam("fingerprint"))
+        .where(
+            (IgnoreFingerprintRecord.expires_at > sqlalchemy.bindparam("now"))
+            | (IgnoreFingerprintRecord.expires_at.is_(None))
+        )
+    )
+)
+_FINGERPRINT_WAS_ESCALATED = sqlalchemy.lambda_stmt(
+    lambda: sqlalchemy.select(
+        sqlalchemy.exists()
+        .where(EventRecord.fingerprint == sqlalchemy.bindparam("fingerprint"))
+        .where(EventRecord.escalated_at.isnot(None))
+    )
+)
+
+_LAST_ESCALATED_AT = sqlalchemy.lambda_stmt(
+    lambda: sqlalchemy.select(sqlalchemy.func.max(EventRecord.escalated_at)).where(
+        EventRecord.source_type == sqlalchemy.bindparam("source_type")
+    )
+)
+_INTERACTIONS_WITH_FINGERPRINT = sqlalchemy.lambda_stmt(
+    lambda: sqlalchemy.select(
+        IgnoreFingerprintRecord.id,
+        IgnoreFingerprintRecord.fingerprint,
+        IgnoreFingerprintRecord.ignore_type,
+        IgnoreFingerprintRecord.reported_at,
+        IgnoreFingerprintRecord.expires_at,
+    ).where(IgnoreFingerprintRecord.fingerprint == sqlalchemy.bindparam("fingerprint"))
+)
+
+# Ignore records are written with core inserts as nothing reads them back from the session.
+_IGNORE_INSERT = sqlalchemy.insert(IgnoreFingerprintRecord)
+
+# Open issues are the newest event per fingerprint, same as `remove_duplicate_events` but done by the database.
+_NEWEST_FIRST = (
+    sqlalchemy.func.row_number()
+    .over(partition_by=EventRecord.fingerprint, order_by=(EventRecord.received_at.desc(), EventRecord.id.asc()))
+    .label("newest_first")
+)
+_RECENT_EVENTS = (
+    sqlalchemy.select(EventRecord, _NEWEST_FIRST)
+    .where(EventRecord.owner.in_(sqlalchemy.bindparam("owners", expanding=True)))
+    .where(EventRecord.received_at >= sqlalchemy.bindparam("cutoff"))
+    .subquery()
+)
+# Ignored issues are dropped with a correlated NOT EXISTS against the active ignore records.
+_OPEN_ISSUES = (
+    sqlalchemy.select(sqlalchemy.orm.aliased(EventRecord, _RECENT_EVENTS))
+    .where(_RECENT_EVENTS.c.newest_first == 1)
+    .where(
+        ~sqlalchemy.exists()
+        .where(IgnoreFingerprintRecord.fingerprint == _RECENT_EVENTS.c.fingerprint)
+        .where(
+            (IgnoreFingerprintRecord.expires_at > sqlalchemy.bindparam("now"))
+            | (IgnoreFingerprintRecord.expires_at.is_(None))
+        )
+    )
+)
+_IGNORED_FINGERPRINTS = (
+    sqlalchemy.select(IgnoreFingerprintRecord.fingerprint)
+    .where(IgnoreFingerprintRecord.fingerprint.in_(sqlalchemy.bindparam("fingerprints", expanding=True)))
+    .where(
+        (IgnoreFingerprintRecord.expires_at > sqlalchemy.bindparam("now"))
+        | (IgnoreFingerprintRecord.expires_at.is_(None))
+    )
+)
+
 
 def remove_duplicate_events(event_record_list: List[EventRecord]) -> List[EventRecord]:
     """Removes duplicates based on fingerprint and chooses the newest issue.
@@ -32,15 +149,29 @@ def remove_duplicate_events(event_record_list: List[EventRecord]) -> List[EventR
         list: of EventRecords with extra fingerprints removed
     """
     events_hash_table: Dict[Optional[str], EventRecord] = {}
+    newest_seen = events_hash_table.get
     for e in event_record_list:
-        if e.fingerprint in events_hash_table:
-            if events_hash_table[e.fingerprint].received_at < e.received_at:
-                events_hash_table[e.fingerprint] = e
-        else:
-            events_hash_table[e.fingerprint] = e
+        fingerprint = e.fingerprint
+        newest = newest_seen(fingerprint)
+        if newest is None or newest.received_at < e.received_at:
+            events_hash_table[fingerprint] = e
     return list(events_hash_table.values())
 
 
+def chunked(items: Sequence[T], size: Optional[int] = None) -> Iterator[Sequence[T]]:
+    """Split a sequence into chunks of at most `size` items.
+
+    Args:
+        items: the sequence to split
+        size: the maximum length of each chunk, defaults to IN_CLAUSE_CHUNK_SIZE
+    Yields:
+        Sequence: consecutive slices of `items`
+    """
+    size = size or IN_CLAUSE_CHUNK_SIZE
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
 class DataStore:
     """Abstraction of the Comet storage layer.
 
@@ -49,15 +180,16 @@ class DataStore:
         documentation for formats.
     """
 
-    def __init__(self, database_uri: str) -> None:
+    def __init__(self, database_uri: str, **engine_kwargs: Any) -> None:
         """Creates a new DataStore instance
 
         Args:
             database_uri (str): Database URL to connect to. Will be passed to sqlalchemy.create_engine, refer to that
             documentation for formats.
+            engine_kwargs (dict): additional keyword arguments for sqlalchemy.create_engine, e.g. poolclass
         """
         # Setting "future" for 2.0 syntax
-        engine = sqlalchemy.create_engine(database_uri, future=True)
+        engine = sqlalchemy.create_engine(database_uri, future=True, **engine_kwargs)
         # expire_on_commit needs to be false due to https://docs.sqlalchemy.org/en/14/errors.html#error-bhk3
         self.session = sqlalchemy.orm.sessionmaker(engine, future=True, expire_on_commit=False)
 
@@ -69,8 +201,22 @@ class DataStore:
         Args:
             record: the record object to store
         """
+        self.add_records([record])
+
+    def add_records(self, records: List[EventRecord], batch_size: int = IN_CLAUSE_CHUNK_SIZE) -> None:
+        """Store many records in the data store in a single transaction.
+
+        The records are flushed in batches of `batch_size`, which lets drivers that support it insert each batch with
+        one executemany round-trip. As with `add_record`, the records get their primary keys and defaults assigned.
+
+        Args:
+            records: the record objects to store
+            batch_size: number of records to flush at once
+        """
         with self.session.begin() as session:
-            session.add(record)
+            for records_chunk in chunked(records, batch_size):
+                session.add_all(records_chunk)
+                session.flush()
 
     def get_unprocessed_events_batch(
         self, wait_for_more: timedelta, max_wait: timedelta, source_type: str
@@ -87,23 +233,27 @@ class DataStore:
             list: list of `EventRecord`s, or empty list if there is nothing to return
         """
 
+        unprocessed = (EventRecord.processed_at.is_(None)) & (EventRecord.source_type == source_type)
+
         # https://explainextended.com/2009/09/18/not-in-vs-not-exists-vs-left-join-is-null-mysql/
         with self.session.begin() as session:
-            events: List[EventRecord] = (
-                session.query(EventRecord)
-                .filter((EventRecord.processed_at.is_(None)) & (EventRecord.source_type == source_type))
-                .order_by(EventRecord.received_at.asc())
-                .all()
-            )
+            # Decide on the received_at bounds alone so full rows are only loaded once the batch is ready.
+            oldest, latest = session.execute(
+                sqlalchemy.select(
+                    sqlalchemy.func.min(EventRecord.received_at), sqlalchemy.func.max(EventRecord.received_at)
+                ).where(unprocessed)
+            ).one()
 
-        now = datetime.utcnow()
+            now = datetime.utcnow()
 
-        if events and events[-1].received_at < now - wait_for_more:
-            return events
-        if events and events[0].received_at < now - max_wait:
-            return events
+            if latest is None or (latest >= now - wait_for_more and oldest >= now - max_wait):
+                return []
+
+            events: List[EventRecord] = (
+                session.query(EventRecord).filter(unprocessed).order_by(EventRecord.received_at.asc()).all()
+            )
 
-        return []
+        return events
 
     def get_events_did_not_addressed(self, source_type: str) -> List[EventRecord]:
         """Get all non-escalated and non-ignored events sent to the user.
@@ -146,16 +296,20 @@ class DataStore:
         Returns:
             bool: True if any of the provided records represents an issue that needs to be reminded about
         """
-        fingerprints = [record.fingerprint for record in records]
+        fingerprints = list({record.fingerprint for record in records})
+        # The most recent sent_at over all the fingerprints, merged across the chunks
+        timestamps: List[datetime] = []
         with self.session.begin() as session:
-            timestamps: List[datetime] = (
-                session.query(sqlalchemy.sql.expression.func.max(EventRecord.sent_at))
-                .filter(EventRecord.fingerprint.in_(fingerprints) & EventRecord.sent_at.isnot(None))
-                .group_by(EventRecord.fingerprint)
-                .all()
-            )
+            for fingerprints_chunk in chunked(fingerprints):
+                last_sent_at = session.execute(
+                    sqlalchemy.select(sqlalchemy.func.max(EventRecord.sent_at)).where(
+                        EventRecord.fingerprint.in_(fingerprints_chunk)
+                    )
+                ).scalar()
+                if last_sent_at is not None:
+                    timestamps.append(last_sent_at)
         if timestamps:
-            return max(timestamps)[0] <= datetime.utcnow() - search_timedelta
+            return max(timestamps) <= datetime.utcnow() - search_timedelta
 
         return False
 
@@ -170,36 +324,42 @@ class DataStore:
         Returns:
             list: list of fingerprints that represent issues that need to be reminded about
         """
-        fingerprints = [record.fingerprint for record in records]
+        fingerprints = list({record.fingerprint for record in records})
+        remind_before = datetime.utcnow() - search_timedelta
+        result: List[str] = []
         with self.session.begin() as session:
-            fingerprints_to_remind = (
-                session.query(
-                    sqlalchemy.sql.expression.func.max(EventRecord.sent_at).label("sent_at"), EventRecord.fingerprint
+            for fingerprints_chunk in chunked(fingerprints):
+                result.extend(
+                    session.execute(
+                        sqlalchemy.select(EventRecord.fingerprint)
+                        .where(EventRecord.fingerprint.in_(fingerprints_chunk), EventRecord.sent_at.isnot(None))
+                        .group_by(EventRecord.fingerprint)
+                        .having(sqlalchemy.func.max(EventRecord.sent_at) <= remind_before)
+                    ).scalars()
                 )
-                .filter(EventRecord.fingerprint.in_(fingerprints) & EventRecord.sent_at.isnot(None))
-                .group_by(EventRecord.fingerprint)
-                .all()
-            )
-        result = []
-        deltat = datetime.utcnow() - search_timedelta
-        for f in fingerprints_to_remind:
-            if f.sent_at <= deltat:
-                result.append(f.fingerprint)
 
         return result
 
     def update_timestamp_column_to_now(self, records: List[EventRecord], column_name: str) -> None:
         """Update the `column_name` of the provided records to now
 
+        The records are updated with one `UPDATE ... WHERE id IN (...)` per chunk of `IN_CLAUSE_CHUNK_SIZE` ids.
+
         Args:
             records: records to update the `column_name` for
             column_name: the name of the datebase column to update
         """
         time_now = datetime.utcnow()
-        updates = [{"id": r.id, column_name: time_now} for r in records]
+        ids = [r.id for r in records]
 
         with self.session.begin() as session:
-            session.bulk_update_mappings(EventRecord, updates)
+            for ids_chunk in chunked(ids):
+                session.execute(
+                    sqlalchemy.update(EventRecord)
+                    .where(EventRecord.id.in_(ids_chunk))
+                    .values({column_name: time_now})
+                    .execution_options(synchronize_session=False)
+                )
 
     def update_processed_at_timestamp_to_now(self, records: List[EventRecord]) -> None:  # pylint: disable=invalid-name
         """Update the processed_at timestamp for to now.
@@ -235,13 +395,7 @@ class DataStore:
             EventRecord: oldest EventRecord with the given fingerprint
         """
         with self.session.begin() as session:
-            return (
-                session.query(EventRecord)
-                .filter(EventRecord.fingerprint == fingerprint)
-                .order_by(EventRecord.received_at.asc())
-                .limit(1)
-                .one_or_none()
-            )
+            return session.execute(_OLDEST_EVENT_WITH_FINGERPRINT, {"fingerprint": fingerprint}).scalar_one_or_none()
 
     def get_latest_event_with_fingerprint(self, fingerprint: str) -> EventRecord:  # pylint: disable=invalid-name
         """
@@ -253,13 +407,7 @@ class DataStore:
             EventRecord: latest EventRecord with the given fingerprint
         """
         with self.session.begin() as session:
-            return (
-                session.query(EventRecord)
-                .filter(EventRecord.fingerprint == fingerprint)
-                .order_by(EventRecord.received_at.desc())
-                .limit(1)
-                .one_or_none()
-            )
+            return session.execute(_LATEST_EVENT_WITH_FINGERPRINT, {"fingerprint": fingerprint}).scalar_one_or_none()
 
     def check_needs_escalation(self, escalation_time: timedelta, event: EventRecord) -> bool:
         """Checks if the event needs to be escalated.
@@ -272,12 +420,81 @@ class DataStore:
         Returns:
             bool: True if the event should be escalated
         """
-        oldest_event = self.get_oldest_event_with_fingerprint(event.fingerprint)
+        with self.session.begin() as session:
+            oldest_received_at = session.execute(
+                _OLDEST_RECEIVED_AT_WITH_FINGERPRINT, {"fingerprint": event.fingerprint}
+            ).scalar()
 
-        if not oldest_event:
+        if not oldest_received_at:
             return False
 
-        return oldest_event.received_at <= datetime.utcnow() - escalation_time
+        return oldest_received_at <= datetime.utcnow() - escalation_time
+
+    def get_oldest_received_at_by_fingerprint(self, fingerprints: List[str]) -> Dict[str, datetime]:
+        """Returns the received_at timestamp of the oldest (first occurrence) event for each of the fingerprints.
+
+        Args:
+            fingerprints: fingerprints to look for
+        Returns:
+            dict: oldest received_at timestamp by fingerprint, fingerprints without any event are left out
+        """
+        return self._aggregate_received_at_by_fingerprint(sqlalchemy.func.min, fingerprints)
+
+    def get_latest_processed_received_at_by_fingerprint(  # pylint: disable=invalid-name
+        self, fingerprints: List[str]
+    ) -> Dict[str, datetime]:
+        """Returns the received_at timestamp of the latest processed event for each of the fingerprints.
+
+        Args:
+            fingerprints: fingerprints to look for
+        Returns:
+            dict: latest processed received_at timestamp by fingerprint, fingerprints without any processed event are
+            left out
+        """
+        return self._aggregate_received_at_by_fingerprint(
+            sqlalchemy.func.max, fingerprints, EventRecord.processed_at.isnot(None)
+        )
+
+    def _aggregate_received_at_by_fingerprint(
+        self, aggregate: Callable[..., Any], fingerprints: Iterable[str], *criteria: ColumnElement[bool]
+    ) -> Dict[str, datetime]:
+        """Runs the grouped `aggregate(received_at)` query for the fingerprints, in chunks of `IN_CLAUSE_CHUNK_SIZE`.
+
+        Args:
+            aggregate: SQL aggregate function to apply to received_at, e.g. sqlalchemy.func.min
+            fingerprints: fingerprints to look for
+            criteria: additional filter criteria for the events
+        Returns:
+            dict: aggregated received_at timestamp by fingerprint
+        """
+        unique_fingerprints = list({fingerprint for fingerprint in fingerprints if fingerprint is not None})
+        received_at: Dict[str, datetime] = {}
+        with self.session.begin() as session:
+            for fingerprints_chunk in chunked(unique_fingerprints):
+                rows = session.execute(
+                    sqlalchemy.select(EventRecord.fingerprint, aggregate(EventRecord.received_at))
+                    .where(EventRecord.fingerprint.in_(fingerprints_chunk), *criteria)
+                    .group_by(EventRecord.fingerprint)
+                )
+                received_at.update(rows.all())
+        return received_at
+
+    def check_needs_escalation_bulk(self, escalation_time: timedelta, events: List[EventRecord]) -> Dict[str, bool]:
+        """Checks for many events at once if they need to be escalated, see `check_needs_escalation`.
+
+        Args:
+            escalation_time: time to delay escalation
+            events: EventRecords to check
+        Returns:
+            dict: True by fingerprint if the events with that fingerprint should be escalated
+        """
+        oldest_received_at = self.get_oldest_received_at_by_fingerprint([event.fingerprint for event in events])
+        escalate_before = datetime.utcnow() - escalation_time
+        return {
+            event.fingerprint: event.fingerprint in oldest_received_at
+            and oldest_received_at[event.fingerprint] <= escalate_before
+            for event in events
+        }
 
     def ignore_event_fingerprint(
         self,
@@ -296,15 +513,41 @@ class DataStore:
             reported_at: specify the time of the reported date
             record_metadata: metadata to hydrate the record with.
         """
-        new_record = IgnoreFingerprintRecord(
-            fingerprint=fingerprint,
-            ignore_type=ignore_type,
-            expires_at=expires_at,
-            reported_at=reported_at,
-            record_metadata=record_metadata,
-        )
         with self.session.begin() as session:
-            session.add(new_record)
+            session.execute(
+                _IGNORE_INSERT,
+                {
+                    "fingerprint": fingerprint,
+                    "ignore_type": ignore_type,
+                    "expires_at": expires_at,
+                    "reported_at": reported_at or datetime.utcnow(),
+                    "record_metadata": record_metadata,
+                },
+            )
+
+    def ignore_event_fingerprints(self, items: Iterable[IgnoreFingerprint]) -> None:
+        """Add many fingerprints to the list of ignored events in a single round-trip.
+
+        Args:
+            items: the fingerprints to ignore, as IgnoreFingerprint or plain tuples with the same field order. Only
+                fingerprint and ignore_type are required, reported_at defaults to now as in `ignore_event_fingerprint`.
+        """
+        now = datetime.utcnow()
+        rows = [
+            {
+                "fingerprint": ignore.fingerprint,
+                "ignore_type": ignore.ignore_type,
+                "expires_at": ignore.expires_at,
+                "reported_at": ignore.reported_at or now,
+                "record_metadata": ignore.record_metadata,
+            }
+            for ignore in (IgnoreFingerprint(*item) for item in items)
+        ]
+        if not rows:
+            return
+
+        with self.session.begin() as session:
+            session.execute(_IGNORE_INSERT, rows)
 
     def fingerprint_is_ignored(self, fingerprint: str) -> bool:
         """Check if a fingerprint is marked as ignored.
@@ -315,16 +558,27 @@ class DataStore:
             bool: True if whitelisted or snoozed
         """
         with self.session.begin() as session:
-            return (
-                session.query(IgnoreFingerprintRecord)
-                .filter(IgnoreFingerprintRecord.fingerprint == fingerprint)
-                .filter(
-                    (IgnoreFingerprintRecord.expires_at > datetime.utcnow())
-                    | (IgnoreFingerprintRecord.expires_at.is_(None))
+            return session.execute(
+                _FINGERPRINT_IS_IGNORED, {"fingerprint": fingerprint, "now": datetime.utcnow()}
+            ).scalar()
+
+    def get_ignored_fingerprints(self, fingerprints: List[str]) -> Set[str]:
+        """Returns the fingerprints that are currently marked as ignored, see `fingerprint_is_ignored`.
+
+        Args:
+            fingerprints: fingerprints to check
+        Returns:
+            set: the whitelisted or snoozed fingerprints
+        """
+        unique_fingerprints = list({fingerprint for fingerprint in fingerprints if fingerprint is not None})
+        now = datetime.utcnow()
+        ignored: Set[str] = set()
+        with self.session.begin() as session:
+            for fingerprints_chunk in chunked(unique_fingerprints):
+                ignored.update(
+                    session.execute(_IGNORED_FINGERPRINTS, {"fingerprints": fingerprints_chunk, "now": now}).scalars()
                 )
-                .count()
-                >= 1
-            )
+        return ignored
 
     def may_send_escalation(self, source_type: str, escalation_reminder_cadence: timedelta) -> bool:
         """Check if another escalation notification is allowed to the source_type escalation recipient.
@@ -339,20 +593,11 @@ class DataStore:
             bool: True if an escalation may be sent, False otherwise
         """
         with self.session.begin() as session:
-            last_escalated = (
-                session.query(EventRecord.escalated_at)
-                .filter(EventRecord.source_type == source_type)
-                .order_by(EventRecord.escalated_at.desc())
-                .limit(1)
-                .one_or_none()
-            )
-
-        if not last_escalated[0]:
-            return True
+            last_escalated = session.execute(_LAST_ESCALATED_AT, {"source_type": source_type}).scalar()
 
-        return last_escalated[0] <= datetime.utcnow() - escalation_reminder_cadence
+        return last_escalated is None or last_escalated <= datetime.utcnow() - escalation_reminder_cadence
 
-    def check_if_previously_escalated(self, event: EventRecord) -> None:
+    def check_if_previously_escalated(self, event: EventRecord) -> bool:
         """Checks if the issue was escalated before.
 
         This looks for previous escalations sent for events with the same fingerprint.
@@ -364,13 +609,28 @@ class DataStore:
             bool: True if any previous event with the same fingerprint was escalated, False otherwise
         """
         with self.session.begin() as session:
-            return (
-                session.query(EventRecord)
-                .filter(EventRecord.fingerprint == event.fingerprint)
-                .filter(EventRecord.escalated_at.isnot(None))
-                .count()
-                >= 1
-            )
+            return session.execute(_FINGERPRINT_WAS_ESCALATED, {"fingerprint": event.fingerprint}).scalar()
+
+    def get_previously_escalated_fingerprints(self, fingerprints: List[str]) -> Set[str]:
+        """Returns the fingerprints that were escalated before, see `check_if_previously_escalated`.
+
+        Args:
+            fingerprints: fingerprints to check
+        Returns:
+            set: the fingerprints with at least one escalated event
+        """
+        unique_fingerprints = list({fingerprint for fingerprint in fingerprints if fingerprint is not None})
+        escalated: Set[str] = set()
+        with self.session.begin() as session:
+            for fingerprints_chunk in chunked(unique_fingerprints):
+                escalated.update(
+                    session.execute(
+                        sqlalchemy.select(EventRecord.fingerprint)
+                        .where(EventRecord.fingerprint.in_(fingerprints_chunk), EventRecord.escalated_at.isnot(None))
+                        .distinct()
+                    ).scalars()
+                )
+        return escalated
 
     def get_open_issues(self, owners: List[str]) -> List[EventRecord]:
         """Return a list of open (newer than 24h), not whitelisted or snoozed issues for the given owners.
@@ -380,32 +640,15 @@ class DataStore:
         Returns:
             list: list of EventRecord, representing open, non-ignored issues for the given owners
         """
-        with self.session.begin() as session:
-            open_issues = (
-                session.query(EventRecord)
-                .filter(EventRecord.owner.in_(owners))
-                .filter(EventRecord.received_at >= datetime.utcnow() - timedelta(days=1))
-                .all()
-            )
-
-            open_issues = remove_duplicate_events(open_issues)
-
-            open_issues_fps = [issue.fingerprint for issue in open_issues]
+        now = datetime.utcnow()
 
-            ignored_issues_fps_tuples = (
-                session.query(IgnoreFingerprintRecord.fingerprint)
-                .filter(IgnoreFingerprintRecord.fingerprint.in_(open_issues_fps))
-                .filter(
-                    (IgnoreFingerprintRecord.expires_at > datetime.utcnow())
-                    | (IgnoreFingerprintRecord.expires_at.is_(None))
-                )
+        with self.session.begin() as session:
+            return (
+                session.execute(_OPEN_ISSUES, {"owners": owners, "cutoff": now - _OPEN_ISSUE_WINDOW, "now": now})
+                .scalars()
                 .all()
             )
 
-        ignored_issues_fps = [t[0] for t in ignored_issues_fps_tuples]
-
-        return [issue for issue in open_issues if issue.fingerprint not in ignored_issues_fps]
-
     def check_if_new(self, fingerprint: str, new_threshold: timedelta) -> bool:
         """Check if an issue is new.
 
@@ -422,19 +665,30 @@ class DataStore:
         """
 
         with self.session.begin() as session:
-            most_recent_processed = (
-                session.query(EventRecord.received_at)
-                .filter(EventRecord.fingerprint == fingerprint)
-                .filter(EventRecord.processed_at.isnot(None))
-                .order_by(EventRecord.received_at.desc())
-                .limit(1)
-                .one_or_none()
-            )
+            most_recent_processed = session.execute(
+                _LATEST_PROCESSED_RECEIVED_AT, {"fingerprint": fingerprint}
+            ).scalar_one_or_none()
 
         if not most_recent_processed:
             return True
 
-        return most_recent_processed[0] <= datetime.utcnow() - new_threshold
+        return most_recent_processed <= datetime.utcnow() - new_threshold
+
+    def check_if_new_bulk(self, fingerprints: List[str], new_threshold: timedelta) -> Dict[str, bool]:
+        """Checks for many issues at once if they are new, see `check_if_new`.
+
+        Args:
+            fingerprints: fingerprints of the issues to evaluate
+            new_threshold: time after which an issue should be considered new again, even if it was seen before
+        Returns:
+            dict: True by fingerprint if the issue is new, False if it is old
+        """
+        most_recent_processed = self.get_latest_processed_received_at_by_fingerprint(fingerprints)
+        new_before = datetime.utcnow() - new_threshold
+        return {
+            fingerprint: fingerprint not in most_recent_processed or most_recent_processed[fingerprint] <= new_before
+            for fingerprint in fingerprints
+        }
 
     def get_events_need_escalation(self, source_type: str) -> List[EventRecord]:
         """Get all the events that the end user escalate manually and weren't escalated already by Comet.
@@ -458,26 +712,16 @@ class DataStore:
             )
             return events_to_escalate
 
-    def get_interactions_fingerprint(self, fingerprint: str) -> List[IgnoreFingerprintRecord]:
+    def get_interactions_fingerprint(self, fingerprint: str) -> List[Dict[str, Any]]:
         """Return the list of all interactions associated with a fingerprint.
 
         Args:
             fingerprint: the fingerprint of the issue
         Returns:
-            list: list of IgnoreFingerprintRecord for the specified fingerprint
+            list: list of dicts with the id, fingerprint, ignore_type, reported_at and expires_at of the
+            IgnoreFingerprintRecords for the specified fingerprint
         """
 
         with self.session.begin() as session:
-            interactions = (
-                session.query(IgnoreFingerprintRecord).filter(IgnoreFingerprintRecord.fingerprint == fingerprint).all()
-            )
-            return [
-                {
-                    "id": t.id,
-                    "fingerprint": t.fingerprint,
-                    "ignore_type": t.ignore_type,
-                    "reported_at": t.reported_at,
-                    "expires_at": t.expires_at,
-                }
-                for t in interactions
-            ]
+            interactions = session.execute(_INTERACTIONS_WITH_FINGERPRINT, {"fingerprint": fingerprint})
+            return [interaction._asdict() for interaction in interactions]
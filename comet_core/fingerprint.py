@@ -14,31 +14,111 @@
 
 """Helper function to compute the fingerprint of alerts."""
 
+__all__ = [
+    "BLACKLISTED",
+    "BLAKE2B",
+    "HASH_ALGORITHMS",
+    "HASH_BYTES",
+    "JSON",
+    "ORJSON",
+    "SERIALIZERS",
+    "SHAKE_256",
+    "bytes_to_hash",
+    "comet_event_fingerprint",
+    "compile_blacklist",
+    "dict_to_hash",
+    "filter_dict",
+    "fingerprint_hmac",
+    "str_to_hash",
+]
+
 import hmac
 import json
-from collections.abc import Iterable
-from copy import deepcopy
-from hashlib import sha256, shake_256
+from functools import lru_cache
+from hashlib import blake2b, sha256, shake_256
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 HASH_BYTES = 16  # 128 bits of entropy, will result in 32 character hexdigest string
 
+# Supported fingerprint hash algorithms. blake2b is considerably faster, but changes every fingerprint, so existing
+# ignore records stop matching once a deployment switches to it.
+SHAKE_256 = "shake_256"
+BLAKE2B = "blake2b"
+HASH_ALGORITHMS = (SHAKE_256, BLAKE2B)
+
+# Supported serializers for the canonical form of the data that is hashed. orjson is faster, but its output differs
+# from json.dumps (separators, non-ASCII characters, floats), so it changes every fingerprint as well. It requires the
+# optional orjson dependency (pip install comet-core[orjson]).
+JSON = "json"
+ORJSON = "orjson"
+SERIALIZERS = (JSON, ORJSON)
+
+# Marks a key as removed in a compiled blacklist trie, see `compile_blacklist`
+BLACKLISTED = object()
+
 
-def comet_event_fingerprint(data_dict, blacklist=None, prefix=""):
+def comet_event_fingerprint(data_dict, blacklist=None, prefix="", algorithm=SHAKE_256, serializer=JSON):
     """Computes the fingerprint of an event by hashing it's data dictionary.
 
     Args:
         data_dict (dict): the dictionary to be hashed (excluding the fields in blacklist)
         blacklist (list): fields to ignore. List of str (for toplevel fields) or str list (for nested fields)
         prefix (str): string that should be prepended to the fingerprint hash
+        algorithm (str): hash algorithm to use, one of HASH_ALGORITHMS
+        serializer (str): serializer for the canonical form of the data, one of SERIALIZERS
     Returns:
         str: the fingerprint
     """
-    data_dict_copy = deepcopy(data_dict)
-    filtered_dict = filter_dict(data_dict_copy, blacklist if blacklist is not None else [])
-    data_hash_str = dict_to_hash(filtered_dict)
+    if blacklist:
+        data_dict = _filter_dict_copy(data_dict, compile_blacklist(blacklist))
+    data_hash_str = dict_to_hash(data_dict, algorithm, serializer)
     return f"{prefix}{data_hash_str}"
 
 
+def compile_blacklist(blacklist):
+    """Compiles a blacklist (see `filter_dict`) into a trie of the keys to remove.
+
+    The trie is a nested read-only mapping keyed by dictionary keys. A value of BLACKLISTED means the key is removed,
+    a mapping value holds the blacklisted sub-keys of that key. Compiled blacklists are cached, as the blacklist of a
+    source type rarely changes, so the same trie is shared by all callers and can not be modified.
+
+    Args:
+        blacklist (list): strings and lists of strings as described in `filter_dict`.
+    Returns:
+        MappingProxyType: the compiled blacklist trie.
+    """
+    return _compile_blacklist(tuple(item if isinstance(item, str) else tuple(item) for item in blacklist))
+
+
+@lru_cache(maxsize=128)
+def _compile_blacklist(blacklist):
+    """Cached implementation of `compile_blacklist`, takes the blacklist as hashable tuple."""
+    trie = {}
+    for item in blacklist:
+        path = (item,) if isinstance(item, str) else item
+        node = trie
+        for sub in path[:-1]:
+            child = node.setdefault(sub, {})
+            if child is BLACKLISTED:
+                break
+            node = child
+        else:
+            node[path[-1]] = BLACKLISTED
+    return _freeze_trie(trie)
+
+
+def _freeze_trie(trie):
+    """Wraps a trie and all of its sub-tries into read-only mappings."""
+    return MappingProxyType(
+        {key: sub_trie if sub_trie is BLACKLISTED else _freeze_trie(sub_trie) for key, sub_trie in trie.items()}
+    )
+
+
 def filter_dict(orig_dict, blacklist):
     """Filter the keys in blacklist from the orig_dict
 
@@ -59,46 +139,101 @@ def filter_dict(orig_dict, blacklist):
     Returns:
         dict: the filtered dict.
     """
-    for item in blacklist:
-        if isinstance(item, str) and item in orig_dict:
-            del orig_dict[item]
-        elif isinstance(item, Iterable):
-            pointer = orig_dict
-            for sub in item[:-1]:
-                pointer = pointer.get(sub, {})
-            if item[-1] in pointer:
-                del pointer[item[-1]]
-
+    _remove_blacklisted(orig_dict, compile_blacklist(blacklist))
     return orig_dict
 
 
-def dict_to_hash(input_dict):
+def _remove_blacklisted(orig_dict, trie):
+    """Removes the keys of the compiled blacklist trie from orig_dict in place."""
+    for key, sub_trie in trie.items():
+        if key not in orig_dict:
+            continue
+        if sub_trie is BLACKLISTED:
+            del orig_dict[key]
+        elif isinstance(orig_dict[key], dict):
+            _remove_blacklisted(orig_dict[key], sub_trie)
+
+
+def _filter_dict_copy(orig_dict, trie):
+    """Same as `filter_dict` with a compiled blacklist, but leaves orig_dict untouched.
+
+    Only the dictionaries on the path to a blacklisted key are copied (shallowly), everything else is shared with
+    orig_dict. This avoids a full deepcopy of the event data just to drop a few keys before hashing.
+
+    Args:
+        orig_dict (dict): the dict to filter.
+        trie (MappingProxyType): the compiled blacklist, see `compile_blacklist`.
+    Returns:
+        dict: the filtered dict.
+    """
+    if not trie or not isinstance(orig_dict, dict):
+        return orig_dict
+
+    filtered = dict(orig_dict)
+    for key, sub_trie in trie.items():
+        if key not in filtered:
+            continue
+        if sub_trie is BLACKLISTED:
+            del filtered[key]
+        else:
+            filtered[key] = _filter_dict_copy(filtered[key], sub_trie)
+    return filtered
+
+
+def dict_to_hash(input_dict, algorithm=SHAKE_256, serializer=JSON):
     """Converts a dictionary into a hash string.
 
     The fields of the dictionary are sorted before hashing, so changing the order of fields does not change the hash.
 
     Args:
         input_dict (dict): input that will be hashed
+        algorithm (str): hash algorithm to use, one of HASH_ALGORITHMS
+        serializer (str): serializer for the canonical form of the input, one of SERIALIZERS
 
     Returns:
         str: hash in hexadecimal representation
+    Raises:
+        ValueError: if the serializer is not supported or not installed
     """
-    data_str = json.dumps(input_dict, sort_keys=True)
-    return str_to_hash(data_str)
+    if serializer == JSON:
+        return str_to_hash(json.dumps(input_dict, sort_keys=True), algorithm)
+    if serializer == ORJSON:
+        if orjson is None:
+            raise ValueError("the orjson serializer requires the orjson package to be installed")
+        return bytes_to_hash(orjson.dumps(input_dict, option=orjson.OPT_SORT_KEYS), algorithm)
+    raise ValueError(f"unsupported fingerprint serializer {serializer!r}, expected one of {SERIALIZERS}")
 
 
-def str_to_hash(input_str):
+def str_to_hash(input_str, algorithm=SHAKE_256):
     """Converts a string into a hash string.
 
-    Uses the SHA-3 shake function to reduce the hash output (and by this it's entropy) to HASH_BYTES.
     Args:
         input_str (str): input that will be hashed
+        algorithm (str): hash algorithm to use, one of HASH_ALGORITHMS
+    Returns:
+        str: hash in hexadecimal representation (2 characters per byte)
+    """
+    return bytes_to_hash(input_str.encode("utf-8"), algorithm)
+
+
+def bytes_to_hash(input_bytes, algorithm=SHAKE_256):
+    """Converts bytes into a hash string.
+
+    Uses the SHA-3 shake function (or BLAKE2b if requested) to reduce the hash output (and by this it's entropy) to
+    HASH_BYTES.
+    Args:
+        input_bytes (bytes): input that will be hashed
+        algorithm (str): hash algorithm to use, one of HASH_ALGORITHMS
     Returns:
         str: hash in hexadecimal representation (2 characters per byte)
+    Raises:
+        ValueError: if the algorithm is not supported
     """
-    input_bytes = input_str.encode("utf-8")
-    hash_str = shake_256(input_bytes).hexdigest(HASH_BYTES)  # pylint: disable=too-many-function-args
-    return hash_str
+    if algorithm == SHAKE_256:
+        return shake_256(input_bytes).hexdigest(HASH_BYTES)  # pylint: disable=too-many-function-args
+    if algorithm == BLAKE2B:
+        return blake2b(input_bytes, digest_size=HASH_BYTES).hexdigest()
+    raise ValueError(f"unsupported fingerprint hash algorithm {algorithm!r}, expected one of {HASH_ALGORITHMS}")
 
 
 def fingerprint_hmac(fingerprint, hmac_secret):
@@ -14,14 +14,100 @@
 
 """Model module - hosting database models."""
 import json
+import os
 from datetime import datetime
 
 import sqlalchemy
 import sqlalchemy.orm
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# JSON implementation for the JSONType columns: "stdlib", "orjson" (orjson encoding), "msgspec" (orjson encoding,
+# msgspec decoding) or "auto" for the fastest installed ones. Decoding never uses orjson as it parses integers above
+# 64 bits as floats. A requested implementation that is not installed falls back to the json module.
+# orjson is opt-in as it changes what is stored: it writes NaN and +-Infinity as null and serializes datetime values
+# (as ISO strings), which the json module rejects.
+JSON_IMPL = os.environ.get("COMET_JSON_IMPL", "stdlib")
+
+_ORJSON = orjson if JSON_IMPL in ("auto", "orjson", "msgspec") else None
+_MSGSPEC_DECODER = msgspec.json.Decoder() if msgspec is not None and JSON_IMPL in ("auto", "msgspec") else None
+
+# Storage of the JSONType columns on sqlite: "text" (UnicodeText, human-readable) or "binary" (LargeBinary holding the
+# UTF-8 JSON bytes, which skips the codec pass on both bind and fetch). Other dialects always keep their current type.
+JSON_STORAGE = os.environ.get("COMET_JSON_STORAGE", "text")
+
 BaseRecord = sqlalchemy.orm.declarative_base()
 
 
+def _json_dumps_bytes(value):
+    """Serializes a value to a UTF-8 encoded JSON document, with orjson if it is selected by JSON_IMPL.
+
+    Values orjson refuses (e.g. non-string dict keys or integers above 64 bits) fall back to the json module. Values
+    orjson accepts differently are not detected, NaN and +-Infinity are written as null and datetime values as strings.
+
+    Args:
+        value (object): a JSON dumpable object
+    Returns:
+        bytes: the JSON document
+    """
+    if _ORJSON is not None:
+        try:
+            return _ORJSON.dumps(value)
+        except _ORJSON.JSONEncodeError:
+            pass
+    return json.dumps(value).encode("utf-8")
+
+
+def _json_dumps(value):
+    """Serializes a value to a JSON string, with orjson if it is selected by JSON_IMPL.
+
+    Args:
+        value (object): a JSON dumpable object
+    Returns:
+        str: the JSON document
+    """
+    if _ORJSON is not None:
+        return _json_dumps_bytes(value).decode("utf-8")
+    return json.dumps(value)
+
+
+def _json_loads(value):
+    """Parses a JSON string, with msgspec if it is selected by JSON_IMPL.
+
+    Documents msgspec refuses (e.g. NaN written by the json module) fall back to the json module.
+
+    Args:
+        value (str|bytes): the JSON document
+    Returns:
+        object: the parsed value
+    """
+    if _MSGSPEC_DECODER is not None:
+        try:
+            return _MSGSPEC_DECODER.decode(value)
+        except ValueError:
+            pass
+    return json.loads(value)
+
+
+def _binary_storage(dialect):
+    """Tells whether JSON documents are stored as bytes for the given dialect.
+
+    Args:
+        dialect (object): the dialect object
+    Returns:
+        bool: True if the JSONType columns use LargeBinary storage
+    """
+    return JSON_STORAGE == "binary" and dialect.name == "sqlite"
+
+
 class JSONType(sqlalchemy.types.TypeDecorator):  # pylint: disable=abstract-method
     """This is for testing purposes, to make the JSON type work with sqlite."""
 
@@ -36,10 +122,13 @@ class JSONType(sqlalchemy.types.TypeDecorator):  # pylint: disable=abstract-meth
         Args:
             dialect (object): SQLAlchemy dialect object
         Returns:
-            object: if dialect name is 'mysql' it will override the type descriptor to JSON()
+            object: if dialect name is 'mysql' it will override the type descriptor to JSON(), on sqlite it is
+                LargeBinary() when JSON_STORAGE is "binary"
         """
         if dialect.name == "mysql":
             return dialect.type_descriptor(sqlalchemy.JSON())
+        if _binary_storage(dialect):
+            return dialect.type_descriptor(sqlalchemy.LargeBinary())
         return dialect.type_descriptor(self.impl)
 
     def process_bind_param(self, value, dialect):
@@ -55,7 +144,7 @@ class JSONType(sqlalchemy.types.TypeDecorator):  # pylint: disable=abstract-meth
         if dialect.name == "mysql":
             return value
         if value is not None:
-            value = json.dumps(value)
+            value = _json_dumps_bytes(value) if _binary_storage(dialect) else _json_dumps(value)
         return value
 
     def process_result_value(self, value, dialect):
@@ -71,18 +160,32 @@ class JSONType(sqlalchemy.types.TypeDecorator):  # pylint: disable=abstract-meth
         if dialect.name == "mysql":
             return value
         if value is not None:
-            value = json.loads(value)
+            value = _json_loads(value)
         return value
 
 
 class EventRecord(BaseRecord):
     """Event model.
     Args:
-        args (list) : arguments list passed to the BaseRecord constructor
-        kwargs (dict) : arguments dict passed to the BaseRecord constructor
+        kwargs (dict) : column values passed to the BaseRecord constructor
     """
 
     __tablename__ = "event"
+    __table_args__ = (
+        # get_unprocessed_events_batch only ever looks at unprocessed events, in received order
+        sqlalchemy.Index(
+            "ix_event_source_type_unprocessed",
+            "source_type",
+            "received_at",
+            postgresql_where=sqlalchemy.text("processed_at IS NULL"),
+            sqlite_where=sqlalchemy.text("processed_at IS NULL"),
+        ),
+        sqlalchemy.Index("ix_event_fingerprint_received_at", "fingerprint", "received_at"),
+        sqlalchemy.Index("ix_event_fingerprint_escalated_at", "fingerprint", "escalated_at"),
+        sqlalchemy.Index("ix_event_owner_received_at", "owner", "received_at"),
+        # Last escalation per source type and the not yet escalated events of a source type
+        sqlalchemy.Index("ix_event_source_type_escalated_at", "source_type", "escalated_at"),
+    )
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
     source_type = sqlalchemy.Column(sqlalchemy.String(250), nullable=False)
     fingerprint = sqlalchemy.Column(sqlalchemy.String(250))
@@ -95,10 +198,9 @@ class EventRecord(BaseRecord):
     escalated_at = sqlalchemy.Column(sqlalchemy.DateTime, default=None)
     processed_at = sqlalchemy.Column(sqlalchemy.DateTime, default=None)
 
-    def __init__(self, *args, **kwargs):
-        self.new = False
-        self.owner_email_overridden = False
-        super().__init__(*args, **kwargs)
+    # Processing flags, not persisted. Class level defaults, so records loaded from the database have them as well.
+    new = False
+    owner_email_overridden = False
 
     def update_metadata(self, metadata):
         """Update optional metadata for the event.
@@ -119,6 +221,7 @@ class IgnoreFingerprintRecord(BaseRecord):
     """Acceptedrisk model."""
 
     __tablename__ = "ignore_fingerprint"
+    __table_args__ = (sqlalchemy.Index("ix_ignore_fingerprint_fingerprint_expires_at", "fingerprint", "expires_at"),)
     id = sqlalchemy.Column(sqlalchemy.Integer, primary_key=True)
     fingerprint = sqlalchemy.Column(sqlalchemy.String(250))
     ignore_type = sqlalchemy.Column(sqlalchemy.String(50))
@@ -12,27 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+"""Compatibility shim for tools that still invoke setup.py, the package metadata lives in pyproject.toml."""
+
 import setuptools
 
-setuptools.setup(
-    name="comet-core",
-    version="2.11.0",
-    url="https://github.com/spotify/comet-core",
-    author="Spotify Platform Security",
-    author_email="wasabi@spotify.com",
-    description="Comet Distributed Security Notification Framework",
-    long_description=open("README.md", "r+", encoding="utf-8").read(),
-    long_description_content_type="text/markdown",
-    packages=["comet_core"],
-    install_requires=["Flask~=2.0", "Flask-Cors~=3.0", "SQLAlchemy~=1.4"],
-    include_package_data=True,
-    classifiers=[
-        "Development Status :: 5 - Production/Stable",
-        "Programming Language :: Python",
-        "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
-    ],
-)
+setuptools.setup()
@@ -14,60 +14,87 @@
 
 """Global test fixtures"""
 from datetime import datetime
-from typing import List
+from typing import TYPE_CHECKING, List
 
 import pytest
 
-from comet_core import Comet
-from comet_core.app import EventContainer
-from comet_core.data_store import DataStore
-from comet_core.model import EventRecord
+if TYPE_CHECKING:
+    from flask import Flask
 
-# pylint: disable=redefined-outer-name
+    from comet_core import Comet
+    from comet_core.app import EventContainer
+    from comet_core.data_store import DataStore
+
+# The comet_core imports are deferred to the fixtures that need them, so collection doesn't pay for SQLAlchemy and Flask.
+# pylint: disable=redefined-outer-name,import-outside-toplevel
 
 
 @pytest.fixture
-def app() -> Comet:
-    """Returns a Comet app."""
-    yield Comet()
+def app(data_store) -> "Comet":
+    """Returns a Comet app backed by the shared in-memory datastore."""
+    from comet_core import Comet
+
+    yield Comet(data_store=data_store)
 
 
 @pytest.fixture
-def messages() -> List[EventContainer]:
+def messages() -> List["EventContainer"]:
     """Get all test messages and their filenames as an iterator.
 
     Returns:
         EventContainer: some test event
     """
+    from comet_core.app import EventContainer
+
     event = EventContainer("test", {})
     event.set_owner("test@acme.org")
     event.set_fingerprint("test")
     return [event]
 
 
+@pytest.fixture(scope="session")
+def shared_data_store() -> "DataStore":
+    """Creates the SQLite backed datastore shared by the tests, so the schema is only created once per session.
+
+    The StaticPool keeps the single in-memory database on one connection, whichever thread checks it out.
+    """
+    from sqlalchemy.pool import StaticPool
+
+    from comet_core.data_store import DataStore
+
+    return DataStore("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+
 @pytest.fixture
-def data_store() -> DataStore:
-    """Creates a SQLite backed datastore."""
-    return DataStore("sqlite://")
+def data_store(shared_data_store) -> "DataStore":
+    """Returns an empty SQLite backed datastore."""
+    from comet_core.model import BaseRecord
+
+    yield shared_data_store
+
+    with shared_data_store.session.begin() as session:
+        for table in reversed(BaseRecord.metadata.sorted_tables):
+            session.execute(table.delete())
 
 
 @pytest.fixture
-def test_db(messages, data_store) -> DataStore:
+def test_db(messages, data_store) -> "DataStore":
     """Setup a test database fixture
 
     Yields:
         DataStore: a sqlite backed datastore with all test data
     """
 
-    for event in messages:
-        data_store.add_record(event.get_record())
+    data_store.add_records([event.get_record() for event in messages])
 
     yield data_store
 
 
 @pytest.fixture
-def data_store_with_test_events(data_store) -> DataStore:
+def data_store_with_test_events(data_store) -> "DataStore":
     """Creates a populated data store."""
+    from comet_core.model import EventRecord
+
     one = EventRecord(received_at=datetime(2018, 7, 7, 9, 0, 0), source_type="datastoretest", owner="a", data={})
     one.fingerprint = "f1"
     two = EventRecord(received_at=datetime(2018, 7, 7, 9, 30, 0), source_type="datastoretest", owner="a", data={})
@@ -80,8 +107,100 @@ def data_store_with_test_events(data_store) -> DataStore:
     )
     three.fingerprint = "f3"
 
-    data_store.add_record(one)
-    data_store.add_record(two)
-    data_store.add_record(three)
+    data_store.add_records([one, two, three])
 
     yield data_store
+
+
+@pytest.fixture(scope="session")
+def api_app() -> "Flask":
+    """Create the Flask app shared by the session, with auth, hydrator and request hydrator registered
+
+    Returns:
+        flask.Flask: the Flask app
+    """
+    from flask import g
+
+    from comet_core.api import CometApi
+
+    api = CometApi(hmac_secret="secret")
+
+    @api.register_auth()
+    def override():
+        if g.test_authorized_for:
+            return g.test_authorized_for
+        return []
+
+    @api.register_hydrator()
+    def test_hydrate(issues):
+        return [{"fingerprint": x.fingerprint} for x in issues]
+
+    @api.register_request_hydrator()
+    def request_hydrator(request):
+        return dict(request.headers)
+
+    return api.create_app()
+
+
+@pytest.fixture(scope="session")
+def api_app_without_request_hydrator() -> "Flask":
+    """Create the Flask app shared by the session, with auth and hydrator registered
+
+    Returns:
+        flask.Flask: the Flask app
+    """
+    from flask import g
+
+    from comet_core.api import CometApi
+
+    api = CometApi(hmac_secret="secret")
+
+    @api.register_auth()
+    def override():
+        if g.test_authorized_for:
+            return g.test_authorized_for
+        return []
+
+    @api.register_hydrator()
+    def test_hydrate(issues):
+        return [{"fingerprint": x.fingerprint} for x in issues]
+
+    return api.create_app()
+
+
+@pytest.fixture(scope="session")
+def bare_api_app() -> "Flask":
+    """Create the Flask app shared by the session, without any registered functions
+
+    Returns:
+        flask.Flask: the Flask app
+    """
+    from comet_core.api import CometApi
+
+    return CometApi().create_app()
+
+
+class EmptyDataStore:
+    """Stands in for the API's data store where a test only needs the endpoints to find nothing."""
+
+    def get_open_issues(self, owners):  # pylint: disable=unused-argument,no-self-use
+        """Returns no issues."""
+        return []
+
+    def get_interactions_fingerprint(self, fingerprint):  # pylint: disable=unused-argument,no-self-use
+        """Returns no interactions."""
+        return []
+
+
+@pytest.fixture
+def empty_api_db(monkeypatch) -> EmptyDataStore:
+    """Makes the v0 API endpoints use an EmptyDataStore instead of a real one."""
+    db = EmptyDataStore()
+    monkeypatch.setattr("comet_core.api_v0.get_db", lambda: db)
+    yield db
+
+
+@pytest.fixture(autouse=True, scope="session")
+def warm_up(bare_api_app, shared_data_store) -> None:  # pylint: disable=unused-argument
+    """Builds the bare API app and the shared data store at session start, so the first test doesn't pay for
+    importing the API modules, compiling the Flask url map and creating the schema."""
@@ -21,25 +21,29 @@ from comet_core.api import CometApi
 from comet_core.api_helper import assert_valid_token, get_db, hydrate_open_issues, hydrate_with_request_headers
 from comet_core.fingerprint import fingerprint_hmac
 
+# The Flask apps are built once per session, each test gets a fresh app context (and with it a fresh g and data store).
+# pylint: disable=redefined-outer-name
 
-@pytest.fixture
-def app_context():
-    api = CometApi()
-    app = api.create_app()
-
-    yield app.app_context()
 
-
-@pytest.fixture
-def app_context_with_request_hydrator():
+@pytest.fixture(scope="session")
+def flask_app_with_request_hydrator():
     api = CometApi()
 
     @api.register_request_hydrator()
     def request_hydrator(request):
         return request
 
-    app = api.create_app()
-    yield app.app_context()
+    return api.create_app()
+
+
+@pytest.fixture
+def app_context(bare_api_app):
+    yield bare_api_app.app_context()
+
+
+@pytest.fixture
+def app_context_with_request_hydrator(flask_app_with_request_hydrator):
+    yield flask_app_with_request_hydrator.app_context()
 
 
 def test_get_db(app_context):
@@ -47,16 +51,14 @@ def test_get_db(app_context):
         assert get_db()
 
 
-def test_no_hydrator():
-    api = CometApi()
-    with api.create_app().app_context():
+def test_no_hydrator(app_context):
+    with app_context:
         assert not hydrate_open_issues([])
 
 
-def test_no_request_hydrator():
-    api = CometApi()
+def test_no_request_hydrator(app_context):
     request_mock = mock.Mock()
-    with api.create_app().app_context():
+    with app_context:
         assert not hydrate_with_request_headers(request_mock)
 
 
@@ -14,77 +14,61 @@
 
 """Test api_helper module"""
 
+import json
 from unittest import mock
 
 import pytest
 from flask import Response, g
 
-from comet_core.api import CometApi
+# The apps are shared fixtures from conftest.py, each client gets a fresh app context so g is per test. The clients of
+# the apps with the test auth function start out authorized for nothing, tests reassign g.test_authorized_for as needed.
+# pylint: disable=missing-param-doc,missing-type-doc,redefined-outer-name
 
 
-@pytest.fixture
-def client():  # pylint: disable=missing-param-doc,missing-type-doc
-    """Create a Flask test client fixture
+@pytest.fixture(autouse=True)
+def api_db(data_store, monkeypatch):
+    """Point the endpoints at the session's shared data store instead of building one per request
 
     Yields:
-        flask.testing.FlaskClient: a Flask testing client
+        DataStore: the empty data store the endpoints use
     """
-    api = CometApi(hmac_secret="secret")
-
-    @api.register_auth()
-    def override():
-        if g.test_authorized_for:
-            return g.test_authorized_for
-        return []
-
-    @api.register_hydrator()
-    def test_hydrate(issues):
-        return [{"fingerprint": x.fingerprint} for x in issues]
-
-    @api.register_request_hydrator()
-    def request_hydrator(request):
-        return dict(request.headers)
-
-    app = api.create_app()
-    with app.app_context():
-        yield app.test_client()
+    monkeypatch.setattr("comet_core.api_v0.get_db", lambda: data_store)
+    yield data_store
 
 
 @pytest.fixture
-def client_without_request_hydrator():  # pylint: disable=missing-param-doc,missing-type-doc
+def client(api_app):
     """Create a Flask test client fixture
 
     Yields:
         flask.testing.FlaskClient: a Flask testing client
     """
-    api = CometApi(hmac_secret="secret")
+    with api_app.app_context():
+        g.test_authorized_for = []
+        yield api_app.test_client()
 
-    @api.register_auth()
-    def override():
-        if g.test_authorized_for:
-            return g.test_authorized_for
-        return []
 
-    @api.register_hydrator()
-    def test_hydrate(issues):
-        return [{"fingerprint": x.fingerprint} for x in issues]
+@pytest.fixture
+def client_without_request_hydrator(api_app_without_request_hydrator):
+    """Create a Flask test client fixture
 
-    app = api.create_app()
-    with app.app_context():
-        yield app.test_client()
+    Yields:
+        flask.testing.FlaskClient: a Flask testing client
+    """
+    with api_app_without_request_hydrator.app_context():
+        g.test_authorized_for = []
+        yield api_app_without_request_hydrator.test_client()
 
 
 @pytest.fixture
-def bad_client():  # pylint: disable=missing-param-doc,missing-type-doc
+def bad_client(bare_api_app):
     """Create a bad Flask test client fixture
 
     Yields:
         flask.testing.FlaskClient: a Flask testing client
     """
-    api = CometApi()
-    app = api.create_app()
-    with app.app_context():
-        yield app.test_client()
+    with bare_api_app.app_context():
+        yield bare_api_app.test_client()
 
 
 def test_hello(client):  # pylint: disable=missing-param-doc,missing-type-doc,redefined-outer-name
@@ -94,42 +78,37 @@ def test_hello(client):  # pylint: disable=missing-param-doc,missing-type-doc,re
 
 
 # pylint: disable=missing-param-doc,missing-type-doc,redefined-outer-name
-def test_get_issues(client, test_db):
+def test_get_issues(client, test_db):  # pylint: disable=unused-argument
     """ "Feed all test messages to the get_issues function
     to see that they get rendered correctly"""
     g.user = "testuser"
-    with mock.patch("comet_core.api_v0.get_db", return_value=test_db):
-        g.test_authorized_for = ["non@existant.com"]
+    g.test_authorized_for = ["non@existant.com"]
 
-        res = client.get("/v0/issues")
-        assert res.status == "200 OK"
-        assert not res.json
+    res = client.get("/v0/issues")
+    assert res.status == "200 OK"
+    assert not res.json
 
-        g.test_authorized_for = ["test@acme.org"]
+    g.test_authorized_for = ["test@acme.org"]
 
-        res = client.get("/v0/issues")
-        assert res.status == "200 OK"
-        assert res.json, res.json
+    res = client.get("/v0/issues")
+    assert res.status == "200 OK"
+    assert res.json, res.json
 
-        g.test_authorized_for = Response(status=401)
+    g.test_authorized_for = Response(status=401)
 
-        res = client.get("/v0/issues")
-        assert res.status == "401 UNAUTHORIZED"
-        assert not res.json
+    res = client.get("/v0/issues")
+    assert res.status == "401 UNAUTHORIZED"
+    assert not res.json
 
 
-def test_get_issues_no_hydrator():
+def test_get_issues_no_hydrator(bad_client, empty_api_db):  # pylint: disable=unused-argument
     """Test the get_issues endpoint still works while there is no hydrator"""
-    app = CometApi().create_app()
-    with app.app_context():
-        client = app.test_client()
-        assert client.get("/v0/issues")
+    assert bad_client.get("/v0/issues")
 
 
 def test_acceptrisk(client):
     """Test the accesprtrisk POST endpoint is fails if
     fingerprint/token empty or not passed"""
-    g.test_authorized_for = []
     res = client.post("/v0/acceptrisk", json={"fingerprint": "", "token": ""})
     assert res.json.get("message") == "acceptrisk failed"
     res = client.post("/v0/acceptrisk", json={})
@@ -138,7 +117,6 @@ def test_acceptrisk(client):
 
 def test_snooze(client):
     """Test the snooze POST endpoint is working"""
-    g.test_authorized_for = []
     res = client.post(
         "/v0/snooze",
         json={
@@ -164,69 +142,67 @@ post_json_data = {
     "fingerprint": "forseti_f0743042e3bbea4a1b163f5accd4c366",
     "token": "7ec8a1ee4308d2d07f71fd5a1c844582cfcca56e915c06fc9518ad5e22c5e718",
 }
+# pre-encoded body for the POST requests, posted with content_type="application/json"
+post_json_body = json.dumps(post_json_data).encode("utf-8")
+
+
+# endpoints marking an issue as addressed, with the message they answer with on success
+action_endpoints = pytest.mark.parametrize(
+    "endpoint,message",
+    [
+        ("resolve", "Thanks for resolving the issue!"),
+        ("falsepositive", "Thanks! We’ve marked this as a false positive"),
+        ("acknowledge", "Thanks for acknowledging!"),
+        ("escalate", "Thanks! This alert has been escalated."),
+    ],
+)
 
 
-def test_resolve(client):
-    """Test the resolve GET endpoint works"""
-    g.test_authorized_for = []
-    res = client.get("/v0/resolve" + get_request_args)
-    assert "Thanks for resolving the issue!" in res.data.decode("utf-8")
+@action_endpoints
+def test_action_endpoint(client, endpoint, message):
+    """Test the GET action endpoints work"""
+    res = client.get(f"/v0/{endpoint}" + get_request_args)
+    assert f"<h2>{message}</h2>".encode("utf-8") in res.data
 
 
-def test_resolve_no_token_passed(client):
-    """Test the resolve endpoint fails when
-    the token is not passed in the args"""
-    g.test_authorized_for = []
-    res = client.get("/v0/resolve?fp=splunk_kjsdkjfskdfhskjdf")
-    assert res.status == "500 INTERNAL SERVER ERROR"
-
-
-def test_resolve_post(client):
-    """Test the resolve POST endpoint works"""
-    g.test_authorized_for = []
-    res = client.post("/v0/resolve", json=post_json_data)
-    expected_response = '{"msg":"Thanks for resolving the issue!",' '"status":"ok"}'
-    assert expected_response in res.data.decode("utf-8")
+@action_endpoints
+def test_action_endpoint_post(client, endpoint, message):
+    """Test the POST action endpoints work"""
+    res = client.post(f"/v0/{endpoint}", data=post_json_body, content_type="application/json")
+    assert res.json == {"msg": message, "status": "ok"}
 
 
-def test_resolve_error(bad_client):
-    """Test the resolve endpoint fails when the args are missing"""
-    res = bad_client.get("/v0/resolve")
+@pytest.mark.parametrize(
+    "endpoint,client_fixture",
+    [
+        ("resolve", "bad_client"),
+        ("falsepositive", "bad_client"),
+        ("acknowledge", "client"),
+        ("escalate", "client"),
+    ],
+)
+def test_action_endpoint_error(request, endpoint, client_fixture):
+    """Test the action endpoints fail when the fingerprint and token are missing"""
+    res = request.getfixturevalue(client_fixture).get(f"/v0/{endpoint}")
     assert res.status == "500 INTERNAL SERVER ERROR"
 
 
-def test_falsepositive(client):
-    """Test the falsepositive GET endpoint works"""
-    g.test_authorized_for = []
-    res = client.get("/v0/falsepositive" + get_request_args)
-    assert "Thanks! We’ve marked this as a false positive" in res.data.decode("utf-8")
+def test_resolve_no_token_passed(client):
+    """Test the resolve endpoint fails when
+    the token is not passed in the args"""
+    res = client.get("/v0/resolve?fp=splunk_kjsdkjfskdfhskjdf")
+    assert res.status == "500 INTERNAL SERVER ERROR"
 
 
 def test_falsepositive_no_token_passed(client):
     """Test the falsepositive endpoint fails when
     the token is not passed in the args"""
-    g.test_authorized_for = []
     res = client.get("/v0/falsepositive?fp=splunk_82998ef6bb3db9dff3dsfdsfsdc")
     assert res.status == "500 INTERNAL SERVER ERROR"
 
 
-def test_falsepositive_post(client):
-    """Test the falsepositive POST endpoint works"""
-    g.test_authorized_for = []
-    res = client.post("/v0/falsepositive", json=post_json_data)
-    expected_response = '{"msg":"Thanks! We\\u2019ve marked this as a false positive",' '"status":"ok"}'
-    assert expected_response in res.data.decode("utf-8")
-
-
-def test_falsepositive_error(bad_client):
-    """Test the falsepositive endpoint fails when the args are missing"""
-    res = bad_client.get("/v0/falsepositive")
-    assert res.status == "500 INTERNAL SERVER ERROR"
-
-
 def test_v0_root(client):
     """Test the v0 endpoint works"""
-    g.test_authorized_for = []
     res = client.get("/v0/")
     assert res.data == b"Comet-API-v0"
 
@@ -237,21 +213,13 @@ def test_dbhealth_check(client):
     assert res.data == b"Comet-API-v0"
 
 
-def test_dbhealth_check_error(client):
+def test_dbhealth_check_error(client, monkeypatch):
     """Test the dbcheck fails when the get_db function raises exception"""
-    with mock.patch("comet_core.api_v0.get_db") as mock_get_db:
-        mock_get_db.side_effect = Exception("XOXO")
-        res = client.get("/v0/dbcheck")
+    monkeypatch.setattr("comet_core.api_v0.get_db", mock.Mock(side_effect=Exception("XOXO")))
+    res = client.get("/v0/dbcheck")
     assert res.json.get("status") == "error"
 
 
-def test_acknowledge(client):
-    """Test the acknowledge GET endpoint works"""
-    g.test_authorized_for = []
-    res = client.get("/v0/acknowledge" + get_request_args)
-    assert "Thanks for acknowledging!" in res.data.decode("utf-8")
-
-
 def test_acknowledge_hmac_validation_failed(client):
     """Test the acknowledge endpoint fails when the fingerprint
     doesn't match the token passed"""
@@ -261,79 +229,40 @@ def test_acknowledge_hmac_validation_failed(client):
     assert res.status == "500 INTERNAL SERVER ERROR"
 
 
-def test_acknowledge_post(client):
-    """Test the acknowledge POST endpoint works"""
-    g.test_authorized_for = []
-    res = client.post("/v0/acknowledge", json=post_json_data)
-    assert '{"msg":"Thanks for acknowledging!","status":"ok"}' in res.data.decode("utf-8")
-
-
-def test_acknowledge_error_no_fingerprint_passed(client):
-    """Test the acknowledge endpoint fails when fingerprint is missing"""
-    g.test_authorized_for = []
-    res = client.get("/v0/acknowledge")
-    assert res.status == "500 INTERNAL SERVER ERROR"
-
-
-def test_escalate(client):
-    """Test the escalate endpoint works"""
-    g.test_authorized_for = []
-    res = client.get("/v0/escalate" + get_request_args)
-    assert "Thanks! This alert has been escalated" in res.data.decode("utf-8")
-
-
-def test_escalate_post(client):
-    """Test the POST escalate endpoint works"""
-    g.test_authorized_for = []
-    res = client.post("/v0/escalate", json=post_json_data)
-    expected_response = '{"msg":"Thanks! This alert has been escalated.","status":"ok"}'
-    assert expected_response in res.data.decode("utf-8")
-
-
 def test_escalate_post_error(client):
     """Test escalation fails when the fingerprint passed is too short"""
-    g.test_authorized_for = []
     res = client.post("/v0/escalate", json={"fingerprint": "splunk"})
     assert "500 INTERNAL SERVER ERROR" in res.status
 
 
-def test_escalate_error(client):
-    """Test escalation fails when when no fingerprint and token are missing"""
-    g.test_authorized_for = []
-    res = client.get("/v0/escalate")
-    assert "500 INTERNAL SERVER ERROR" in res.status
-
-
 def test_escalate_error_post(client):
     """Test escalation fails when the fingerprint passed contains tags"""
-    g.test_authorized_for = []
     res = client.post("/v0/escalate", json={"fingerprint": "splunk_4025ad30<script>"})
     assert "500 INTERNAL SERVER ERROR" in res.status
 
 
 def test_endpoint_post_request_hydrator(client):
-    g.test_authorized_for = []
-    res = client.post("/v0/acknowledge", json=post_json_data, headers={"slack_channel": "channel"})
-    assert '{"msg":"Thanks for acknowledging!","status":"ok"}' in res.data.decode("utf-8")
+    res = client.post(
+        "/v0/acknowledge", data=post_json_body, content_type="application/json", headers={"slack_channel": "channel"}
+    )
+    assert b'{"msg":"Thanks for acknowledging!","status":"ok"}' in res.data
 
 
 def test_endpoint_get_request_hydrator(client):
-    g.test_authorized_for = []
     res = client.get("/v0/acknowledge" + get_request_args)
-    assert "Thanks for acknowledging!" in res.data.decode("utf-8")
+    assert b"Thanks for acknowledging!" in res.data
 
 
 def test_endpoint_post_no_request_hydrator(client_without_request_hydrator):
     """test that even if comet api doesn't have request hydrator
     the response doesn't change"""
-    g.test_authorized_for = []
     res = client_without_request_hydrator.post(
-        "/v0/acknowledge", json=post_json_data, headers={"slack_channel": "channel"}
+        "/v0/acknowledge", data=post_json_body, content_type="application/json", headers={"slack_channel": "channel"}
     )
-    assert '{"msg":"Thanks for acknowledging!","status":"ok"}' in res.data.decode("utf-8")
+    assert b'{"msg":"Thanks for acknowledging!","status":"ok"}' in res.data
 
 
-def test_endpoint_get_interactions(client):
+def test_endpoint_get_interactions(client, empty_api_db):  # pylint: disable=unused-argument
     g.test_authorized_for = ["non@existant.com"]
-    res = client.post("/v0/interactions", json=post_json_data)
-    assert "[]" in res.data.decode("utf-8")
+    res = client.post("/v0/interactions", data=post_json_body, content_type="application/json")
+    assert b"[]" in res.data
@@ -15,29 +15,74 @@
 """Test comet_handler"""
 
 import json
+import sys
 from datetime import datetime, timedelta
 from unittest import mock
 
-from freezegun import freeze_time
+import pytest
 
+import comet_core.app
+import comet_core.data_store
 from comet_core import Comet
 from comet_core.app import EventContainer
 from comet_core.model import EventRecord, IgnoreFingerprintRecord
 
 
+class CallRecorder:
+    """A cheap stand-in for mock.Mock() for routers and escalators, only keeping the call count and the last call."""
+
+    __slots__ = ("call_count", "call_args")
+
+    def __init__(self):
+        self.call_count = 0
+        self.call_args = None
+
+    def __call__(self, *args, **kwargs):
+        self.call_count += 1
+        self.call_args = (args, kwargs)
+
+
+@pytest.fixture(autouse=True)
+def sleep_calls(monkeypatch):
+    """Keeps the tests from sleeping, e.g. in the Comet.run loop, and records the time.sleep calls."""
+    recorder = CallRecorder()
+    monkeypatch.setattr("time.sleep", recorder)
+    yield recorder
+
+
+FROZEN_NOW = datetime(2018, 5, 9, 9, 0, 0)
+
+
+class FrozenDatetime(datetime):
+    """A datetime whose utcnow() always returns FROZEN_NOW."""
+
+    @classmethod
+    def utcnow(cls):
+        return FROZEN_NOW
+
+
+@pytest.fixture
+def frozen_utcnow(monkeypatch):
+    """Freezes datetime.utcnow() for comet_core.app, comet_core.data_store and this module.
+
+    Only the datetime name in these modules is replaced, which is much cheaper than freezegun's patching of every
+    loaded module.
+    """
+    for module in (comet_core.app, comet_core.data_store, sys.modules[__name__]):
+        monkeypatch.setattr(module, "datetime", FrozenDatetime)
+    yield FROZEN_NOW
+
+
 # pylint: disable=missing-docstring
-def test_process_unprocessed_events_digest_mode():
-    app = Comet()
-    app.register_parser("datastoretest", json)
-    app.register_parser("datastoretest2", json)
-    app.register_parser("datastoretest3", json)
-    app.register_parser("datastoretest4", json)
+def test_process_unprocessed_events_digest_mode(app):
+    now = datetime.utcnow()
+    app.register_parsers({"datastoretest": json, "datastoretest2": json, "datastoretest3": json})
 
     app.set_config("datastoretest2", {})
 
-    specific_router = mock.Mock()
-    router = mock.Mock()
-    escalator = mock.Mock()
+    specific_router = CallRecorder()
+    router = CallRecorder()
+    escalator = CallRecorder()
     app.register_router("datastoretest2", func=specific_router)
     app.register_router(func=router)
     app.register_escalator(func=escalator)
@@ -45,49 +90,42 @@ def test_process_unprocessed_events_digest_mode():
     check_user = "an_owner"
     already_processed_user = "already_processed_owner"
 
-    app.data_store.add_record(
-        EventRecord(
-            id=1,
-            received_at=datetime.utcnow() - timedelta(days=5),
-            source_type="datastoretest",
-            owner=already_processed_user,
-            data={},
-            processed_at=datetime.utcnow() - timedelta(days=5),
-            fingerprint="f1",
-        )
-    )
-
-    app.data_store.add_record(
-        EventRecord(
-            id=2,
-            received_at=datetime.utcnow() - timedelta(days=4),
-            source_type="datastoretest",
-            owner=already_processed_user,
-            data={},
-            fingerprint="f1",
-        )
-    )
-
-    app.data_store.add_record(
-        EventRecord(
-            id=3,
-            received_at=datetime.utcnow() - timedelta(days=3),
-            source_type="datastoretest2",
-            owner=check_user,
-            data={},
-            fingerprint="f3",
-        )
-    )
-
-    app.data_store.add_record(
-        EventRecord(
-            id=4,
-            received_at=datetime.utcnow() - timedelta(days=3),
-            source_type="datastoretest3",
-            owner=check_user,
-            data={},
-            fingerprint="f4",
-        )
+    app.data_store.add_records(
+        [
+            EventRecord(
+                id=1,
+                received_at=now - timedelta(days=5),
+                source_type="datastoretest",
+                owner=already_processed_user,
+                data={},
+                processed_at=now - timedelta(days=5),
+                fingerprint="f1",
+            ),
+            EventRecord(
+                id=2,
+                received_at=now - timedelta(days=4),
+                source_type="datastoretest",
+                owner=already_processed_user,
+                data={},
+                fingerprint="f1",
+            ),
+            EventRecord(
+                id=3,
+                received_at=now - timedelta(days=3),
+                source_type="datastoretest2",
+                owner=check_user,
+                data={},
+                fingerprint="f3",
+            ),
+            EventRecord(
+                id=4,
+                received_at=now - timedelta(days=3),
+                source_type="datastoretest3",
+                owner=check_user,
+                data={},
+                fingerprint="f4",
+            ),
+        ]
     )
 
     app.process_unprocessed_events()
@@ -104,7 +142,7 @@ def test_process_unprocessed_events_digest_mode():
     app.data_store.add_record(
         EventRecord(
             id=5,
-            received_at=datetime.utcnow() - timedelta(days=2),
+            received_at=now - timedelta(days=2),
             source_type="datastoretest",
             owner=check_user,
             data={},
@@ -119,75 +157,65 @@ def test_process_unprocessed_events_digest_mode():
 
 
 # pylint: disable=missing-docstring
-def test_process_unprocessed_events_non_digest_mode():
-    app = Comet()
+def test_process_unprocessed_events_non_digest_mode(app):
+    now = datetime.utcnow()
     app.register_parser("datastoretest4", json)
 
     check_user = "an_owner"
-    router = mock.Mock()
-    escalator = mock.Mock()
+    router = CallRecorder()
+    escalator = CallRecorder()
     app.register_router(func=router)
     app.register_escalator(func=escalator)
 
     app.set_config("datastoretest4", {"communication_digest_mode": False, "new_threshold": timedelta(days=14)})
 
-    app.data_store.add_record(
-        EventRecord(
-            id=6,
-            received_at=datetime.utcnow() - timedelta(days=8),
-            source_type="datastoretest4",
-            sent_at=datetime.utcnow() - timedelta(days=8),
-            processed_at=datetime.utcnow() - timedelta(days=8),
-            owner=check_user,
-            data={},
-            fingerprint="f5",
-        )
-    )
-
-    app.data_store.add_record(
-        EventRecord(
-            id=7,
-            received_at=datetime.utcnow() - timedelta(days=2),
-            source_type="datastoretest4",
-            owner=check_user,
-            data={},
-            fingerprint="f5",
-        )
-    )
-
-    app.data_store.add_record(
-        EventRecord(
-            id=8,
-            received_at=datetime.utcnow(),
-            source_type="datastoretest4",
-            owner=check_user,
-            data={},
-            fingerprint="f6",
-        )
-    )
-
-    app.data_store.add_record(
-        EventRecord(
-            id=9,
-            received_at=datetime.utcnow() - timedelta(days=2),
-            source_type="datastoretest4",
-            sent_at=datetime.utcnow() - timedelta(days=2),
-            processed_at=datetime.utcnow() - timedelta(days=2),
-            owner=check_user,
-            data={},
-            fingerprint="f7",
-        )
-    )
-
-    app.data_store.add_record(
-        EventRecord(
-            id=10,
-            received_at=datetime.utcnow(),
-            source_type="datastoretest4",
-            owner=check_user,
-            data={},
-            fingerprint="f7",
-        )
+    app.data_store.add_records(
+        [
+            EventRecord(
+                id=6,
+                received_at=now - timedelta(days=8),
+                source_type="datastoretest4",
+                sent_at=now - timedelta(days=8),
+                processed_at=now - timedelta(days=8),
+                owner=check_user,
+                data={},
+                fingerprint="f5",
+            ),
+            EventRecord(
+                id=7,
+                received_at=now - timedelta(days=2),
+                source_type="datastoretest4",
+                owner=check_user,
+                data={},
+                fingerprint="f5",
+            ),
+            EventRecord(
+                id=8,
+                received_at=now,
+                source_type="datastoretest4",
+                owner=check_user,
+                data={},
+                fingerprint="f6",
+            ),
+            EventRecord(
+                id=9,
+                received_at=now - timedelta(days=2),
+                source_type="datastoretest4",
+                sent_at=now - timedelta(days=2),
+                processed_at=now - timedelta(days=2),
+                owner=check_user,
+                data={},
+                fingerprint="f7",
+            ),
+            EventRecord(
+                id=10,
+                received_at=now,
+                source_type="datastoretest4",
+                owner=check_user,
+                data={},
+                fingerprint="f7",
+            ),
+        ]
     )
 
     # f5 is expected to be reminded
@@ -218,6 +246,29 @@ def test_event_container():
     assert "a" in record.event_metadata
 
 
+def test_fingerprint_hash_algorithm():
+    app = Comet(fingerprint_hash_algorithm="blake2b")
+    app.register_parser("test", json.loads)
+    app.message_callback("test", '{"a": "b"}')
+
+    with app.data_store.session.begin() as session:
+        fingerprint = session.query(EventRecord.fingerprint).scalar()
+    assert fingerprint == EventContainer("test", {"a": "b"}, "blake2b").fingerprint
+    assert fingerprint != EventContainer("test", {"a": "b"}).fingerprint
+
+    with pytest.raises(ValueError):
+        Comet(fingerprint_hash_algorithm="md5")
+
+
+def test_fingerprint_serializer_requires_orjson(monkeypatch):
+    monkeypatch.setattr(comet_core.app, "orjson", None)
+    with pytest.raises(ValueError, match="requires the orjson package"):
+        Comet(fingerprint_serializer="orjson")
+
+    with pytest.raises(ValueError):
+        Comet(fingerprint_serializer="pickle")
+
+
 def test_message_callback(app):
     @app.register_parser("test")
     def parse_message(message):
@@ -281,6 +332,9 @@ def test_register_parser(app):
     app.register_parser("test2", parse_message)
     assert len(app.parsers) == 2
 
+    app.register_parsers({"test2": json, "test3": json})
+    assert app.parsers == {"test1": parse_message, "test2": json, "test3": json}
+
 
 def test_register_config_provider(app):
     assert not app.real_time_config_providers
@@ -386,7 +440,7 @@ def test_validate_config(app):
     app.validate_config()
     assert not app.parsers
 
-    app = Comet()
+    app = Comet(data_store=app.data_store)
 
     app.register_parser("test1", parse_message)
 
@@ -414,30 +468,28 @@ def test_start_stop_inputs(app):
     assert TestInput.stop.called
 
 
-def test_run(app):
-    def f(*args):
+def test_run(app, sleep_calls):
+    def f():
         app.running = False
 
-    app.process_unprocessed_events = mock.Mock()
-    with mock.patch("time.sleep") as mocked_sleep:
-        mocked_sleep.side_effect = f
-        app.run()
-    mocked_sleep.assert_called_once()
+    app.process_unprocessed_events = mock.Mock(side_effect=f)
+    app.run()
+    assert sleep_calls.call_count == 1
     app.process_unprocessed_events.assert_called_once()
 
 
-@freeze_time("2018-05-09 09:00:00")
+@pytest.mark.usefixtures("frozen_utcnow")
 # pylint: disable=missing-docstring
-def test_process_unprocessed_real_time_events():
-    app = Comet()
+def test_process_unprocessed_real_time_events(app):
+    now = datetime.utcnow()
     app.register_parser("real_time_source", json)
     app.register_parser("datastoretest", json)
 
     app.register_real_time_source("real_time_source")
 
-    real_time_router = mock.Mock()
-    router = mock.Mock()
-    escalator = mock.Mock()
+    real_time_router = CallRecorder()
+    router = CallRecorder()
+    escalator = CallRecorder()
     app.register_router("real_time_source", func=real_time_router)
     app.register_router(func=router)
     app.register_escalator(func=escalator)
@@ -445,55 +497,48 @@ def test_process_unprocessed_real_time_events():
     check_user = "an_owner"
     already_processed_user = "already_processed_owner"
 
-    # already processed regular event
-    app.data_store.add_record(
-        EventRecord(
-            id=1,
-            received_at=datetime.utcnow() - timedelta(days=5),
-            source_type="datastoretest",
-            owner=already_processed_user,
-            data={},
-            processed_at=datetime.utcnow() - timedelta(days=5),
-            fingerprint="f1",
-        )
-    )
-
-    # already processed real time event
-    app.data_store.add_record(
-        EventRecord(
-            id=2,
-            received_at=datetime.utcnow() - timedelta(days=5),
-            source_type="real_time_source",
-            owner=already_processed_user,
-            processed_at=datetime.utcnow() - timedelta(days=5),
-            data={},
-            fingerprint="f2",
-        )
-    )
-
-    # not processed real time event
-    app.data_store.add_record(
-        EventRecord(
-            id=3,
-            received_at=datetime.utcnow() - timedelta(days=3),
-            source_type="real_time_source",
-            owner=check_user,
-            data={},
-            fingerprint="f3",
-        )
-    )
-
-    # real time event needs escalation
-    app.data_store.add_record(
-        EventRecord(
-            id=4,
-            received_at=datetime.utcnow() - timedelta(days=3),
-            sent_at=datetime.utcnow() - timedelta(days=3),
-            source_type="real_time_source",
-            owner=check_user,
-            data={},
-            fingerprint="f4",
-        )
+    app.data_store.add_records(
+        [
+            # already processed regular event
+            EventRecord(
+                id=1,
+                received_at=now - timedelta(days=5),
+                source_type="datastoretest",
+                owner=already_processed_user,
+                data={},
+                processed_at=now - timedelta(days=5),
+                fingerprint="f1",
+            ),
+            # already processed real time event
+            EventRecord(
+                id=2,
+                received_at=now - timedelta(days=5),
+                source_type="real_time_source",
+                owner=already_processed_user,
+                processed_at=now - timedelta(days=5),
+                data={},
+                fingerprint="f2",
+            ),
+            # not processed real time event
+            EventRecord(
+                id=3,
+                received_at=now - timedelta(days=3),
+                source_type="real_time_source",
+                owner=check_user,
+                data={},
+                fingerprint="f3",
+            ),
+            # real time event needs escalation
+            EventRecord(
+                id=4,
+                received_at=now - timedelta(days=3),
+                sent_at=now - timedelta(days=3),
+                source_type="real_time_source",
+                owner=check_user,
+                data={},
+                fingerprint="f4",
+            ),
+        ]
     )
 
     app.data_store.ignore_event_fingerprint("f4", IgnoreFingerprintRecord.ESCALATE_MANUALLY)
@@ -506,16 +551,16 @@ def test_process_unprocessed_real_time_events():
     assert escalator.call_count == 1
 
 
-@freeze_time("2018-05-09 09:00:00")
+@pytest.mark.usefixtures("frozen_utcnow")
 # pylint: disable=missing-docstring
-def test_process_unprocessed_whitelisted_real_time_events():
-    app = Comet()
+def test_process_unprocessed_whitelisted_real_time_events(app):
+    now = datetime.utcnow()
     app.register_parser("real_time_source", json)
     app.register_real_time_source("real_time_source")
 
-    real_time_router = mock.Mock()
-    router = mock.Mock()
-    escalator = mock.Mock()
+    real_time_router = CallRecorder()
+    router = CallRecorder()
+    escalator = CallRecorder()
     app.register_router("real_time_source", func=real_time_router)
     app.register_router(func=router)
     app.register_escalator(func=escalator)
@@ -525,8 +570,8 @@ def test_process_unprocessed_whitelisted_real_time_events():
     app.data_store.add_record(
         EventRecord(
             id=4,
-            received_at=datetime.utcnow() - timedelta(days=3),
-            sent_at=datetime.utcnow() - timedelta(days=3),
+            received_at=now - timedelta(days=3),
+            sent_at=now - timedelta(days=3),
             source_type="real_time_source",
             owner=check_user,
             data={},
@@ -542,8 +587,8 @@ def test_process_unprocessed_whitelisted_real_time_events():
     assert escalator.call_count == 0
 
 
-def test_handle_non_addressed_events():
-    app = Comet()
+def test_handle_non_addressed_events(app):
+    now = datetime.utcnow()
 
     @app.register_parser("real_time_source")
     def parse_message(message):
@@ -566,40 +611,39 @@ def test_handle_non_addressed_events():
     app.register_real_time_source("real_time_source")
     app.register_real_time_source("real_time_source2")
 
-    escalator = mock.Mock()
-    escalator2 = mock.Mock()
+    escalator = CallRecorder()
+    escalator2 = CallRecorder()
     app.register_escalator("real_time_source", func=escalator)
     app.register_escalator("real_time_source2", func=escalator2)
 
     already_processed_user = "already_processed_owner"
 
-    # already processed real time event - needs escalation
-    app.data_store.add_record(
-        EventRecord(
-            id=2,
-            received_at=datetime.utcnow() - timedelta(hours=1),
-            source_type="real_time_source",
-            owner=already_processed_user,
-            processed_at=datetime.utcnow() - timedelta(hours=1),
-            sent_at=datetime.utcnow() - timedelta(hours=1),
-            data={"search_name": "alert search name", "name": "needs escalation"},
-            fingerprint="f2",
-        )
-    )
-
-    # already processed real time event - still early for escalation
-    # the event sent 35 min ago.
-    app.data_store.add_record(
-        EventRecord(
-            id=3,
-            received_at=datetime.utcnow() - timedelta(hours=1),
-            source_type="real_time_source2",
-            owner=already_processed_user,
-            processed_at=datetime.utcnow() - timedelta(minutes=35),
-            sent_at=datetime.utcnow() - timedelta(minutes=35),
-            data={"search_name": "alert search name", "name": "doesnt need escalation"},
-            fingerprint="f3",
-        )
+    app.data_store.add_records(
+        [
+            # already processed real time event - needs escalation
+            EventRecord(
+                id=2,
+                received_at=now - timedelta(hours=1),
+                source_type="real_time_source",
+                owner=already_processed_user,
+                processed_at=now - timedelta(hours=1),
+                sent_at=now - timedelta(hours=1),
+                data={"search_name": "alert search name", "name": "needs escalation"},
+                fingerprint="f2",
+            ),
+            # already processed real time event - still early for escalation
+            # the event sent 35 min ago.
+            EventRecord(
+                id=3,
+                received_at=now - timedelta(hours=1),
+                source_type="real_time_source2",
+                owner=already_processed_user,
+                processed_at=now - timedelta(minutes=35),
+                sent_at=now - timedelta(minutes=35),
+                data={"search_name": "alert search name", "name": "doesnt need escalation"},
+                fingerprint="f3",
+            ),
+        ]
     )
 
     app.handle_non_addressed_events()
@@ -609,6 +653,7 @@ def test_handle_non_addressed_events():
 
 def test_handle_non_escalatable_events(app):
     """Test that Comet handles events that has been set to not escalate."""
+    now = datetime.utcnow()
 
     @app.register_parser("real_time_source")
     def parse_message(message):
@@ -621,18 +666,18 @@ def test_handle_non_escalatable_events(app):
 
     app.register_real_time_source("real_time_source")
 
-    escalator = mock.Mock()
+    escalator = CallRecorder()
     app.register_escalator("real_time_source", func=escalator)
 
     # This event should not be escalated.
     app.data_store.add_record(
         EventRecord(
             id=2,
-            received_at=datetime.utcnow() - timedelta(hours=1),
+            received_at=now - timedelta(hours=1),
             source_type="real_time_source",
             owner="event owner",
-            processed_at=datetime.utcnow() - timedelta(hours=1),
-            sent_at=datetime.utcnow() - timedelta(hours=1),
+            processed_at=now - timedelta(hours=1),
+            sent_at=now - timedelta(hours=1),
             data={"search_name": "alert search name", "name": "needs escalation"},
             fingerprint="f2",
         )
@@ -648,6 +693,7 @@ def test_handle_default_escalation_strategy(app):
     This differs from the "do-not-escalate"-test since there the escalation is
     explicitly set to False and here it is missing.
     """
+    now = datetime.utcnow()
 
     @app.register_parser("real_time_source")
     def parse_message(message):
@@ -660,18 +706,18 @@ def test_handle_default_escalation_strategy(app):
 
     app.register_real_time_source("real_time_source")
 
-    escalator = mock.Mock()
+    escalator = CallRecorder()
     app.register_escalator("real_time_source", func=escalator)
 
     # This event should be escalated once
     app.data_store.add_record(
         EventRecord(
             id=2,
-            received_at=datetime.utcnow() - timedelta(hours=1),
+            received_at=now - timedelta(hours=1),
             source_type="real_time_source",
             owner="event owner",
-            processed_at=datetime.utcnow() - timedelta(hours=1),
-            sent_at=datetime.utcnow() - timedelta(hours=36),
+            processed_at=now - timedelta(hours=1),
+            sent_at=now - timedelta(hours=36),
             data={"search_name": "alert search name", "name": "needs escalation"},
             fingerprint="f2",
         )
@@ -18,9 +18,11 @@
 from datetime import datetime, timedelta
 
 import pytest
+import sqlalchemy
 from freezegun import freeze_time
 
-from comet_core.data_store import remove_duplicate_events
+from comet_core import model
+from comet_core.data_store import DataStore, IgnoreFingerprint, chunked, remove_duplicate_events
 from comet_core.model import EventRecord, IgnoreFingerprintRecord
 
 
@@ -36,8 +38,8 @@ def non_addressed_event():
         owner="a",
         sent_at=datetime(2018, 7, 7, 9, 0, 0),
         data={},
+        fingerprint="f1",
     )
-    event.fingerprint = "f1"
     return event
 
 
@@ -50,8 +52,8 @@ def addressed_event(data_store):
         owner="a",
         sent_at=datetime(2018, 7, 7, 9, 30, 0),
         data={},
+        fingerprint="f2",
     )
-    ack_event.fingerprint = "f2"
     data_store.ignore_event_fingerprint(ack_event.fingerprint, ignore_type=IgnoreFingerprintRecord.ACKNOWLEDGE)
     return ack_event
 
@@ -65,8 +67,8 @@ def event_to_escalate(data_store):
         owner="a",
         sent_at=datetime(2018, 7, 7, 9, 30, 0),
         data={},
+        fingerprint="f3",
     )
-    escalated_event.fingerprint = "f3"
     data_store.ignore_event_fingerprint(
         escalated_event.fingerprint, ignore_type=IgnoreFingerprintRecord.ESCALATE_MANUALLY
     )
@@ -76,12 +78,29 @@ def event_to_escalate(data_store):
 @pytest.fixture
 def data_store_with_real_time_events(data_store, addressed_event, non_addressed_event, event_to_escalate):
     """Data store with real time events added."""
-    data_store.add_record(addressed_event)
-    data_store.add_record(non_addressed_event)
-    data_store.add_record(event_to_escalate)
+    data_store.add_records([addressed_event, non_addressed_event, event_to_escalate])
     return data_store
 
 
+@pytest.fixture
+def reminder_events(data_store):
+    """The events of the reminder tests, issue 1b is not stored yet.
+
+    Time is frozen while the test runs, so the reminder checks see the same now as the events.
+    """
+    with freeze_time("2018-07-07 10:00:00"):
+        now = datetime.utcnow()
+        one_a = EventRecord(sent_at=now - timedelta(days=9), source_type="datastoretest", fingerprint="f1")
+        one_b = EventRecord(sent_at=now - timedelta(days=3), source_type="datastoretest", fingerprint="f1")
+        two_a = EventRecord(sent_at=now - timedelta(days=10), source_type="datastoretest", fingerprint="f2")
+        two_b = EventRecord(sent_at=now - timedelta(days=8), source_type="datastoretest", fingerprint="f2")
+        two_c = EventRecord(source_type="datastoretest", fingerprint="f2")  # sent_at NULL
+        three_a = EventRecord(source_type="datastoretest", fingerprint="f3")  # sent_at NULL
+
+        data_store.add_records([one_a, two_a, two_b, two_c, three_a])
+        yield {"1a": one_a, "1b": one_b, "2a": two_a, "3a": three_a}
+
+
 def test_data_store(data_store, messages):
     """Test that the new events can be added to the data store."""
     for event in messages:
@@ -99,8 +118,7 @@ def test_date_sorting(data_store):
     old.fingerprint = "same"
     new.fingerprint = "same"
 
-    data_store.add_record(old)
-    data_store.add_record(new)
+    data_store.add_records([old, new])
 
     oldest = data_store.get_oldest_event_with_fingerprint("same")
     latest = data_store.get_latest_event_with_fingerprint("same")
@@ -110,78 +128,59 @@ def test_date_sorting(data_store):
 
 
 @freeze_time("2018-07-07 10:00:00")
-def test_get_unprocessed_events_batch_will_wait(data_store_with_test_events):
-    """Test that no events are returned when asked to wait for a long time."""
-    val = data_store_with_test_events.get_unprocessed_events_batch(
-        timedelta(days=1024 * 365), timedelta(days=1024 * 365), "datastoretest"
-    )
-    assert val == []
-
-
-@freeze_time("2018-07-07 10:00:00")
-def test_get_unprocessed_events(data_store_with_test_events):
-    """Test that all unprocessed events are returned for a given source type."""
-    val = data_store_with_test_events.get_unprocessed_events_batch(
-        timedelta(minutes=1), timedelta(minutes=1), "datastoretest"
-    )
-    assert len(val) == 2
-
-
-@freeze_time("2018-07-07 10:00:00")
-def test_get_unprocessed_events_wait_for_more(data_store_with_test_events):
-    """Test that unprocessed events are returned.
-
-    TODO: Do this test add anyting compared to the above?
-    """
-    val = data_store_with_test_events.get_unprocessed_events_batch(
-        timedelta(minutes=30), timedelta(minutes=120), "datastoretest"
-    )
-    assert val == []
-
-    val = data_store_with_test_events.get_unprocessed_events_batch(
-        timedelta(minutes=29), timedelta(minutes=120), "datastoretest"
-    )
-    assert len(val) == 2
+@pytest.mark.parametrize(
+    "wait_for_more,max_wait,expected_count",
+    [
+        # the events are 30 (f2) and 60 (f1) minutes old
+        (timedelta(days=1024 * 365), timedelta(days=1024 * 365), 0),
+        (timedelta(minutes=1), timedelta(minutes=1), 2),
+        (timedelta(minutes=30), timedelta(minutes=120), 0),
+        (timedelta(minutes=29), timedelta(minutes=120), 2),
+    ],
+)
+def test_get_unprocessed_events_batch(data_store_with_test_events, wait_for_more, max_wait, expected_count):
+    """Test that all unprocessed events of a source type are returned once the batch stopped growing or is too old."""
+    val = data_store_with_test_events.get_unprocessed_events_batch(wait_for_more, max_wait, "datastoretest")
+    assert len(val) == expected_count
 
 
 @freeze_time("2018-07-07 10:00:00")
-def test_update_sent_at_timestamp_to_now(data_store_with_test_events):
-    """Tests that updating the sent_at timestamp for events is working."""
+@pytest.mark.parametrize(
+    "update_method,column_name",
+    [
+        ("update_sent_at_timestamp_to_now", "sent_at"),
+        ("update_event_escalated_at_to_now", "escalated_at"),
+        ("update_processed_at_timestamp_to_now", "processed_at"),
+    ],
+)
+def test_update_timestamp_to_now(data_store_with_test_events, update_method, column_name):
+    """Tests that updating a timestamp column for events is working."""
     val = data_store_with_test_events.get_unprocessed_events_batch(
         timedelta(minutes=1), timedelta(minutes=1), "datastoretest"
     )
     assert len(val) == 2
 
-    data_store_with_test_events.update_sent_at_timestamp_to_now(val)
+    getattr(data_store_with_test_events, update_method)(val)
     record = data_store_with_test_events.get_latest_event_with_fingerprint(val[0].fingerprint)
-    assert isinstance(record.sent_at, datetime)
+    assert isinstance(getattr(record, column_name), datetime)
 
 
 @freeze_time("2018-07-07 10:00:00")
-def test_update_event_escalation_at_to_now(data_store_with_test_events):
-    """Tests that updating escalated_at for events is working."""
+def test_update_timestamp_column_to_now_only_updates_given_records(data_store_with_test_events):
+    """Tests that all given records, and only those, get the timestamp."""
     val = data_store_with_test_events.get_unprocessed_events_batch(
         timedelta(minutes=1), timedelta(minutes=1), "datastoretest"
     )
-    assert len(val) == 2
-    data_store_with_test_events.update_event_escalated_at_to_now(val)
-    record = data_store_with_test_events.get_latest_event_with_fingerprint(val[0].fingerprint)
-    assert isinstance(record.escalated_at, datetime)
-
+    data_store_with_test_events.update_timestamp_column_to_now(val, "sent_at")
 
-@freeze_time("2018-07-07 10:00:00")
-def test_update_processed_at_timestamp_to_now(data_store_with_test_events):
-    """Tests that updating processed_at for events is working."""
-    val = data_store_with_test_events.get_unprocessed_events_batch(
-        timedelta(minutes=1), timedelta(minutes=1), "datastoretest"
-    )
-    assert len(val) == 2
-    data_store_with_test_events.update_processed_at_timestamp_to_now(val)
-    record = data_store_with_test_events.get_latest_event_with_fingerprint(val[0].fingerprint)
-    assert isinstance(record.processed_at, datetime)
+    for fingerprint in ("f1", "f2"):
+        assert data_store_with_test_events.get_latest_event_with_fingerprint(fingerprint).sent_at == datetime(
+            2018, 7, 7, 10, 0, 0
+        )
+    assert data_store_with_test_events.get_latest_event_with_fingerprint("f3").sent_at is None
 
 
-def test_get_any_issues_need_reminder(data_store):
+def test_get_any_issues_need_reminder(data_store, reminder_events):
     """Tests events that needs reminders.
 
     Part 1: Add three events to the datastore and check that two are returned.
@@ -200,31 +199,7 @@ def test_get_any_issues_need_reminder(data_store):
                            ^
                         -7days
     """
-    test_fingerprint1 = "f1"
-    test_fingerprint2 = "f2"
-    test_fingerprint3 = "f3"
-
-    one_a = EventRecord(sent_at=datetime.utcnow() - timedelta(days=9), source_type="datastoretest")
-    one_a.fingerprint = test_fingerprint1
-    one_b = EventRecord(sent_at=datetime.utcnow() - timedelta(days=3), source_type="datastoretest")
-    one_b.fingerprint = test_fingerprint1
-
-    two_a = EventRecord(sent_at=datetime.utcnow() - timedelta(days=10), source_type="datastoretest")
-    two_a.fingerprint = test_fingerprint2
-    two_b = EventRecord(sent_at=datetime.utcnow() - timedelta(days=8), source_type="datastoretest")
-    two_b.fingerprint = test_fingerprint2
-
-    two_c = EventRecord(source_type="datastoretest")  # sent_at NULL
-    two_c.fingerprint = test_fingerprint2
-
-    three_a = EventRecord(source_type="datastoretest")  # sent_at NULL
-    three_a.fingerprint = test_fingerprint3
-
-    data_store.add_record(one_a)
-    data_store.add_record(two_a)
-    data_store.add_record(two_b)
-    data_store.add_record(two_c)
-    data_store.add_record(three_a)
+    records = [reminder_events["1a"], reminder_events["2a"], reminder_events["3a"]]
 
     # issue \ time --->
     #   1 --------a------|-------------->
@@ -233,13 +208,13 @@ def test_get_any_issues_need_reminder(data_store):
     #                    ^
     #                 -7days
 
-    result = data_store.get_any_issues_need_reminder(timedelta(days=7), [one_a, two_a, three_a])
+    result = data_store.get_any_issues_need_reminder(timedelta(days=7), records)
 
     assert len(result) == 2
-    assert test_fingerprint2 in result
-    assert test_fingerprint1 in result
+    assert "f2" in result
+    assert "f1" in result
 
-    data_store.add_record(one_b)
+    data_store.add_record(reminder_events["1b"])
 
     # issue \ time --->
     #   1 --------a------|-----b-------->
@@ -248,13 +223,13 @@ def test_get_any_issues_need_reminder(data_store):
     #                    ^
     #                 -7days
 
-    result = data_store.get_any_issues_need_reminder(timedelta(days=7), [one_a, two_a, three_a])
+    result = data_store.get_any_issues_need_reminder(timedelta(days=7), records)
 
     assert len(result) == 1
-    assert test_fingerprint2 in result
+    assert "f2" in result
 
 
-def test_check_any_issue_needs_reminder(data_store):
+def test_check_any_issue_needs_reminder(data_store, reminder_events):
     """Checks if any event needs reminder.
 
     Part 1: Add three events to the datastore and check that two are returned.
@@ -273,31 +248,7 @@ def test_check_any_issue_needs_reminder(data_store):
                            ^
                         -7days
     """
-    test_fingerprint1 = "f1"
-    test_fingerprint2 = "f2"
-    test_fingerprint3 = "f3"
-
-    one_a = EventRecord(sent_at=datetime.utcnow() - timedelta(days=9), source_type="datastoretest")
-    one_a.fingerprint = test_fingerprint1
-    one_b = EventRecord(sent_at=datetime.utcnow() - timedelta(days=3), source_type="datastoretest")
-    one_b.fingerprint = test_fingerprint1
-
-    two_a = EventRecord(sent_at=datetime.utcnow() - timedelta(days=10), source_type="datastoretest")
-    two_a.fingerprint = test_fingerprint2
-    two_b = EventRecord(sent_at=datetime.utcnow() - timedelta(days=8), source_type="datastoretest")
-    two_b.fingerprint = test_fingerprint2
-
-    two_c = EventRecord(source_type="datastoretest")  # sent_at NULL
-    two_c.fingerprint = test_fingerprint2
-
-    three_a = EventRecord(source_type="datastoretest")  # sent_at NULL
-    three_a.fingerprint = test_fingerprint3
-
-    data_store.add_record(one_a)
-    data_store.add_record(two_a)
-    data_store.add_record(two_b)
-    data_store.add_record(two_c)
-    data_store.add_record(three_a)
+    records = [reminder_events["1a"], reminder_events["2a"], reminder_events["3a"]]
 
     # issue \ time --->
     #   1 --------a------|-------------->
@@ -305,9 +256,9 @@ def test_check_any_issue_needs_reminder(data_store):
     #   3 ---------------|--------------> (3a sent_at == NULL)
     #                    ^
     #                 -7days
-    assert data_store.check_any_issue_needs_reminder(timedelta(days=7), [one_a, two_a, three_a])
+    assert data_store.check_any_issue_needs_reminder(timedelta(days=7), records)
 
-    data_store.add_record(one_b)
+    data_store.add_record(reminder_events["1b"])
 
     # issue \ time --->
     #   1 --------a------|-----b-------->
@@ -315,7 +266,23 @@ def test_check_any_issue_needs_reminder(data_store):
     #   3 ---------------|--------------> (3a sent_at == NULL)
     #                    ^
     #                 -7days
-    assert not data_store.check_any_issue_needs_reminder(timedelta(days=7), [one_a, two_a, three_a])
+    assert not data_store.check_any_issue_needs_reminder(timedelta(days=7), records)
+
+
+def test_reminder_checks_chunked(data_store, monkeypatch):
+    """Checks that the reminder checks merge their results across IN clause chunks."""
+    now = datetime.utcnow()
+    monkeypatch.setattr("comet_core.data_store.IN_CLAUSE_CHUNK_SIZE", 1)
+
+    old = EventRecord(sent_at=now - timedelta(days=9), source_type="datastoretest", fingerprint="f1")
+    recent = EventRecord(sent_at=now - timedelta(days=3), source_type="datastoretest", fingerprint="f2")
+    unsent = EventRecord(source_type="datastoretest", fingerprint="f3")
+    data_store.add_records([old, recent, unsent])
+
+    assert sorted(data_store.get_any_issues_need_reminder(timedelta(days=7), [old, recent, unsent, old])) == ["f1"]
+    assert data_store.check_any_issue_needs_reminder(timedelta(days=7), [old, unsent])
+    assert not data_store.check_any_issue_needs_reminder(timedelta(days=7), [old, recent, unsent])
+    assert not data_store.check_any_issue_needs_reminder(timedelta(days=7), [unsent])
 
 
 def test_check_nonexisting_event(data_store):
@@ -324,8 +291,10 @@ def test_check_nonexisting_event(data_store):
     assert not data_store.check_needs_escalation(timedelta(days=1), event)
 
 
+@freeze_time("2018-07-07 10:00:00")
 def test_check_needs_escalation(data_store):
     """Checks if events needs escalation by adding multiple events with the same fingerprint."""
+    now = datetime.utcnow()
 
     test_fingerprint1 = "f1"
     test_fingerprint2 = "f2"
@@ -334,25 +303,19 @@ def test_check_needs_escalation(data_store):
     one = EventRecord(received_at=datetime(2018, 2, 19, 0, 0, 11), source_type="datastoretest", owner="a", data={})
     one.fingerprint = test_fingerprint1
 
-    two = EventRecord(received_at=datetime.utcnow(), source_type="datastoretest", owner="a", data={})
+    two = EventRecord(received_at=now, source_type="datastoretest", owner="a", data={})
     two.fingerprint = test_fingerprint1
 
-    three = EventRecord(
-        received_at=datetime.utcnow() - timedelta(hours=23), source_type="datastoretest", owner="a", data={}
-    )
+    three = EventRecord(received_at=now - timedelta(hours=23), source_type="datastoretest", owner="a", data={})
     three.fingerprint = test_fingerprint2
 
-    four = EventRecord(received_at=datetime.utcnow(), source_type="datastoretest", owner="a", data={})
+    four = EventRecord(received_at=now, source_type="datastoretest", owner="a", data={})
     four.fingerprint = test_fingerprint2
 
-    five = EventRecord(received_at=datetime.utcnow(), source_type="datastoretest", owner="a", data={})
+    five = EventRecord(received_at=now, source_type="datastoretest", owner="a", data={})
     four.fingerprint = test_fingerprint3
 
-    data_store.add_record(one)
-    data_store.add_record(two)
-    data_store.add_record(three)
-    data_store.add_record(four)
-    data_store.add_record(five)
+    data_store.add_records([one, two, three, four, five])
 
     three.fingerprint = test_fingerprint2
 
@@ -361,6 +324,39 @@ def test_check_needs_escalation(data_store):
     assert not data_store.check_needs_escalation(timedelta(days=1), five)
 
 
+def test_check_needs_escalation_bulk(data_store):
+    """Checks that the batched escalation check matches the per-event one."""
+    now = datetime.utcnow()
+    one = EventRecord(received_at=datetime(2018, 2, 19, 0, 0, 11), source_type="datastoretest", owner="a", data={})
+    one.fingerprint = "f1"
+    two = EventRecord(received_at=now, source_type="datastoretest", owner="a", data={})
+    two.fingerprint = "f1"
+    three = EventRecord(received_at=now, source_type="datastoretest", owner="a", data={})
+    three.fingerprint = "f2"
+
+    data_store.add_records([one, two, three])
+
+    unknown = EventRecord(received_at=now, source_type="datastoretest", owner="a", data={})
+    unknown.fingerprint = "f3"
+
+    assert data_store.get_oldest_received_at_by_fingerprint(["f1", "f1", "f2", "f3"]) == {
+        "f1": one.received_at,
+        "f2": three.received_at,
+    }
+    assert data_store.check_needs_escalation_bulk(timedelta(days=1), [two, three, unknown]) == {
+        "f1": True,
+        "f2": False,
+        "f3": False,
+    }
+    assert data_store.check_needs_escalation_bulk(timedelta(days=1), []) == {}
+
+
+def test_chunked():
+    """Checks that sequences are split into bounded chunks."""
+    assert list(chunked([1, 2, 3, 4, 5], 2)) == [[1, 2], [3, 4], [5]]
+    assert list(chunked([], 2)) == []
+
+
 def test_check_acceptedrisk_event_fingerprint(data_store):
     """Check that ignored events are properly handled by their fingerprint."""
     test_fingerprint1 = "f1"
@@ -371,6 +367,63 @@ def test_check_acceptedrisk_event_fingerprint(data_store):
     assert data_store.fingerprint_is_ignored(test_fingerprint1)
 
 
+def test_ignore_event_fingerprints(data_store):
+    """Check that many fingerprints can be ignored at once."""
+    data_store.ignore_event_fingerprints(
+        [
+            ("f1", IgnoreFingerprintRecord.ACCEPT_RISK, None),
+            ("f2", IgnoreFingerprintRecord.SNOOZE, datetime(2018, 2, 23, 0, 0, 11)),
+            ("f3", IgnoreFingerprintRecord.SNOOZE, datetime(3000, 2, 23, 0, 0, 11)),
+        ]
+    )
+    data_store.ignore_event_fingerprints([])
+
+    assert data_store.fingerprint_is_ignored("f1")
+    assert not data_store.fingerprint_is_ignored("f2")
+    assert data_store.fingerprint_is_ignored("f3")
+    assert data_store.get_interactions_fingerprint("f1")[0]["reported_at"]
+
+
+@freeze_time("2018-07-07 10:00:00")
+def test_ignore_event_fingerprints_reported_at_and_metadata(data_store):
+    """Check that reported_at and record_metadata can be set in bulk, with reported_at defaulting to now."""
+    data_store.ignore_event_fingerprints(
+        [
+            IgnoreFingerprint("f1", IgnoreFingerprintRecord.ACCEPT_RISK, record_metadata={"user": "a"}),
+            IgnoreFingerprint("f2", IgnoreFingerprintRecord.SNOOZE, reported_at=datetime(2018, 7, 1)),
+            ("f3", IgnoreFingerprintRecord.FALSE_POSITIVE),
+        ]
+    )
+
+    with data_store.session.begin() as session:
+        records = session.execute(
+            sqlalchemy.select(
+                IgnoreFingerprintRecord.fingerprint,
+                IgnoreFingerprintRecord.reported_at,
+                IgnoreFingerprintRecord.record_metadata,
+            ).order_by(IgnoreFingerprintRecord.fingerprint)
+        ).all()
+    assert records == [
+        ("f1", datetime(2018, 7, 7, 10), {"user": "a"}),
+        ("f2", datetime(2018, 7, 1), None),
+        ("f3", datetime(2018, 7, 7, 10), None),
+    ]
+
+
+def test_get_ignored_fingerprints(data_store):
+    """Check that ignored fingerprints are looked up in bulk."""
+    data_store.ignore_event_fingerprints(
+        [
+            ("f1", IgnoreFingerprintRecord.ACCEPT_RISK, None),
+            ("f2", IgnoreFingerprintRecord.SNOOZE, datetime(2018, 2, 23, 0, 0, 11)),
+            ("f3", IgnoreFingerprintRecord.SNOOZE, datetime(3000, 2, 23, 0, 0, 11)),
+        ]
+    )
+
+    assert data_store.get_ignored_fingerprints(["f1", "f2", "f3", "f4", "f1"]) == {"f1", "f3"}
+    assert data_store.get_ignored_fingerprints([]) == set()
+
+
 def test_check_snoozed_event(data_store):
     """Check that snoozed events are not ignored."""
     test_fingerprint2 = "f2"
@@ -385,72 +438,84 @@ def test_check_snoozed_event(data_store):
     assert not data_store.fingerprint_is_ignored(test_fingerprint2)
 
 
+@freeze_time("2018-07-07 10:00:00")
 def test_may_send_escalation(data_store):
     """Test the escalation function from a datastore with both escalated and non-escalated events."""
+    now = datetime.utcnow()
 
     data_store.add_record(EventRecord(source_type="type1", escalated_at=None))
     assert data_store.may_send_escalation("type1", timedelta(days=7))
 
-    data_store.add_record(EventRecord(source_type="type1", escalated_at=datetime.utcnow() - timedelta(days=8)))
+    data_store.add_record(EventRecord(source_type="type1", escalated_at=now - timedelta(days=8)))
     assert data_store.may_send_escalation("type1", timedelta(days=7))
 
-    data_store.add_record(EventRecord(source_type="type1", escalated_at=datetime.utcnow() - timedelta(days=6)))
+    data_store.add_record(EventRecord(source_type="type1", escalated_at=now - timedelta(days=6)))
     assert not data_store.may_send_escalation("type1", timedelta(days=7))
 
     data_store.add_record(EventRecord(source_type="type2", escalated_at=None))
     assert data_store.may_send_escalation("type2", timedelta(days=7))
 
+    # No events at all for the source type
+    assert data_store.may_send_escalation("type3", timedelta(days=7))
 
+
+@freeze_time("2018-07-07 10:00:00")
 def test_check_if_previously_escalated(data_store):
     """Test the 'previously escalated' function by adding events and then escalate them."""
+    now = datetime.utcnow()
 
     one = EventRecord(source_type="test_type", fingerprint="f1", escalated_at=None)
     data_store.add_record(one)
 
-    two = EventRecord(source_type="test_type", fingerprint="f2", escalated_at=datetime.utcnow() - timedelta(days=1))
+    two = EventRecord(source_type="test_type", fingerprint="f2", escalated_at=now - timedelta(days=1))
     data_store.add_record(two)
 
     assert not data_store.check_if_previously_escalated(one)
     assert data_store.check_if_previously_escalated(two)
 
+    data_store.add_record(EventRecord(source_type="test_type", fingerprint="f1", escalated_at=now - timedelta(days=1)))
+
+    assert data_store.check_if_previously_escalated(one)
+
+
+def test_get_previously_escalated_fingerprints(data_store):
+    """Test the bulk 'previously escalated' lookup."""
+    data_store.add_record(EventRecord(source_type="test_type", fingerprint="f1", escalated_at=None))
     data_store.add_record(
-        EventRecord(source_type="test_type", fingerprint="f1", escalated_at=datetime.utcnow() - timedelta(days=1))
+        EventRecord(source_type="test_type", fingerprint="f2", escalated_at=datetime.utcnow() - timedelta(days=1))
     )
 
-    assert data_store.check_if_previously_escalated(one)
+    assert data_store.get_previously_escalated_fingerprints(["f1", "f2", "f3"]) == {"f2"}
 
 
+@freeze_time("2018-07-07 10:00:00")
 def test_get_open_issues(data_store):
     """Tests getting open issues by adding events of different types and check how many are still open."""
+    now = datetime.utcnow()
 
-    one = EventRecord(source_type="test_type", fingerprint="f1", received_at=datetime.utcnow(), owner="test")
+    one = EventRecord(source_type="test_type", fingerprint="f1", received_at=now, owner="test")
     data_store.add_record(one)
 
-    two = EventRecord(
-        source_type="test_type", fingerprint="f2", received_at=datetime.utcnow() - timedelta(days=0.9), owner="test"
-    )
+    two = EventRecord(source_type="test_type", fingerprint="f2", received_at=now - timedelta(days=0.9), owner="test")
     data_store.add_record(two)
 
-    three = EventRecord(
-        source_type="test_type", fingerprint="f3", received_at=datetime.utcnow() - timedelta(days=2), owner="test"
-    )
+    three = EventRecord(source_type="test_type", fingerprint="f3", received_at=now - timedelta(days=2), owner="test")
     data_store.add_record(three)
 
-    four = EventRecord(source_type="test_type", fingerprint="f4", received_at=datetime.utcnow(), owner="not_test")
+    four = EventRecord(source_type="test_type", fingerprint="f4", received_at=now, owner="not_test")
     data_store.add_record(four)
 
     five = EventRecord(
-        source_type="test_type", fingerprint="f5", received_at=datetime.utcnow() - timedelta(days=1.5), owner="not_test"
+        source_type="test_type", fingerprint="f5", received_at=now - timedelta(days=1.5), owner="not_test"
     )
     data_store.add_record(five)
 
-    six = EventRecord(
-        source_type="test_type", fingerprint="f2", received_at=datetime.utcnow() - timedelta(days=0.2), owner="test"
-    )
+    six = EventRecord(source_type="test_type", fingerprint="f2", received_at=now - timedelta(days=0.2), owner="test")
     data_store.add_record(six)
 
     open_issues = data_store.get_open_issues(["test"])
     assert len(open_issues) == 2
+    assert [issue.received_at for issue in open_issues if issue.fingerprint == "f2"] == [six.received_at]
 
     open_issues = data_store.get_open_issues(["test", "not_test"])
     assert len(open_issues) == 3
@@ -468,16 +533,18 @@ def test_get_open_issues(data_store):
     assert len(open_issues) == 1
 
 
+@freeze_time("2018-07-07 10:00:00")
 def test_check_if_new(data_store):
     """Check if there are new issues by adding a variety of different events."""
+    now = datetime.utcnow()
 
-    timestamp = datetime.utcnow()
+    timestamp = now
     one_a = EventRecord(source_type="test_type", fingerprint="f1", received_at=timestamp)
 
-    timestamp = datetime.utcnow() - timedelta(days=1)
+    timestamp = now - timedelta(days=1)
     one_b = EventRecord(source_type="test_type", fingerprint="f1", received_at=timestamp, processed_at=timestamp)
 
-    timestamp = datetime.utcnow() - timedelta(days=8)
+    timestamp = now - timedelta(days=8)
     one_c = EventRecord(source_type="test_type", fingerprint="f1", received_at=timestamp, processed_at=timestamp)
 
     assert data_store.check_if_new("f1", timedelta(days=7))
@@ -492,6 +559,27 @@ def test_check_if_new(data_store):
     assert not data_store.check_if_new("f1", timedelta(days=7))
 
 
+def test_check_if_new_bulk(data_store):
+    """Check that the bulk new issue check matches the single fingerprint one."""
+    now = datetime.utcnow()
+    timestamp = now - timedelta(days=1)
+    data_store.add_record(EventRecord(source_type="test_type", fingerprint="f1", received_at=now))
+    data_store.add_record(
+        EventRecord(source_type="test_type", fingerprint="f2", received_at=timestamp, processed_at=timestamp)
+    )
+    timestamp = now - timedelta(days=8)
+    data_store.add_record(
+        EventRecord(source_type="test_type", fingerprint="f3", received_at=timestamp, processed_at=timestamp)
+    )
+
+    assert data_store.check_if_new_bulk(["f1", "f2", "f3", "f4"], timedelta(days=7)) == {
+        "f1": True,
+        "f2": False,
+        "f3": True,
+        "f4": True,
+    }
+
+
 def test_remove_duplicate_events():
     """Test the remove_duplicate_events function by ensuring that duplicate events are removed."""
     one = EventRecord(received_at=datetime(2018, 2, 19, 0, 0, 11), source_type="datastoretest", owner="a", data={})
@@ -503,11 +591,25 @@ def test_remove_duplicate_events():
 
     records = [one, two, three]
     records = remove_duplicate_events(records)
-    assert three in records
-    assert one not in records
+    kept = {id(record) for record in records}
+    assert id(three) in kept
+    assert id(one) not in kept
     assert len(records) == 2
 
 
+def test_remove_duplicate_events_many_records():
+    """Test that remove_duplicate_events keeps the newest event per fingerprint in a large batch."""
+    start = datetime(2018, 2, 19)
+    records = [
+        EventRecord(received_at=start + timedelta(minutes=i), source_type="datastoretest", fingerprint=f"f{i % 100}")
+        for i in range(5000)
+    ]
+
+    newest = remove_duplicate_events(records)
+    assert len(newest) == 100
+    assert all(e.received_at >= start + timedelta(minutes=4900) for e in newest)
+
+
 def test_get_real_time_events_did_not_addressed(data_store_with_real_time_events, non_addressed_event):
     """Test getting realtime events that were not addressed.
 
@@ -518,7 +620,7 @@ def test_get_real_time_events_did_not_addressed(data_store_with_real_time_events
     non_addressed_events = data_store_with_real_time_events.get_events_did_not_addressed(source_type)
 
     # Compare the id of the events as the event objects themselves are not equal.
-    assert non_addressed_event.id in [x.id for x in non_addressed_events]
+    assert non_addressed_event.id in {x.id for x in non_addressed_events}
 
 
 def test_get_real_time_events_need_escalation(data_store_with_real_time_events, event_to_escalate):
@@ -530,7 +632,7 @@ def test_get_real_time_events_need_escalation(data_store_with_real_time_events,
     events_to_escalate = data_store_with_real_time_events.get_events_need_escalation(source_type)
 
     # Compare the id of the events as the event objects themselves are not equal.
-    assert event_to_escalate.__repr__() in [x.__repr__() for x in events_to_escalate]
+    assert event_to_escalate.__repr__() in {x.__repr__() for x in events_to_escalate}
 
 
 def test_ignore_event_fingerprint_with_metadata(data_store):
@@ -540,13 +642,11 @@ def test_ignore_event_fingerprint_with_metadata(data_store):
     data_store.ignore_event_fingerprint(
         fingerprint, ignore_type=IgnoreFingerprintRecord.ESCALATE_MANUALLY, record_metadata=record_metadata
     )
-    with data_store.session.begin() as session:
-        result = (
-            session.query(IgnoreFingerprintRecord)
-            .filter(IgnoreFingerprintRecord.fingerprint == fingerprint)
-            .one_or_none()
-        )
-        assert result.record_metadata == record_metadata
+    with data_store.session() as session:
+        result = session.execute(
+            sqlalchemy.select(IgnoreFingerprintRecord).where(IgnoreFingerprintRecord.fingerprint == fingerprint)
+        ).scalar_one_or_none()
+    assert result.record_metadata == record_metadata
 
 
 def test_get_interactions_for_fingerprint(data_store):
@@ -583,3 +683,128 @@ def test_get_interactions_for_fingerprint(data_store):
     ]
     result = data_store.get_interactions_fingerprint(fingerprint)
     assert result == expected
+
+
+def test_schema_created_for_recreated_database(tmp_path):
+    """Checks that a database file that was removed gets its schema again from the next DataStore."""
+    database_file = tmp_path / "comet.db"
+    DataStore(f"sqlite:///{database_file}")
+    database_file.unlink()
+
+    data_store = DataStore(f"sqlite:///{database_file}")
+    assert not data_store.fingerprint_is_ignored("f1")
+
+
+def test_indexes_created(data_store):
+    """Checks that the indexes for the hot queries are part of the schema."""
+    with data_store.session.begin() as session:
+        inspector = sqlalchemy.inspect(session.connection())
+        event_indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes("event")}
+        ignore_indexes = {index["name"] for index in inspector.get_indexes("ignore_fingerprint")}
+
+    assert event_indexes["ix_event_source_type_unprocessed"] == ["source_type", "received_at"]
+    assert event_indexes["ix_event_fingerprint_received_at"] == ["fingerprint", "received_at"]
+    assert event_indexes["ix_event_source_type_escalated_at"] == ["source_type", "escalated_at"]
+    assert "ix_ignore_fingerprint_fingerprint_expires_at" in ignore_indexes
+
+
+def test_json_columns_round_trip(data_store):
+    """Checks that event data survives storage, including values orjson does not serialize."""
+    data = {"a": ["b", 1, 2.5, None, True], "näme": {"nested": "v"}, "big": 2 ** 70, "keys": {1: "int key"}}
+    data_store.add_record(EventRecord(source_type="test_type", fingerprint="f1", data=data, event_metadata={"m": 1}))
+
+    event = data_store.get_latest_event_with_fingerprint("f1")
+    assert event.data == {
+        "a": ["b", 1, 2.5, None, True],
+        "näme": {"nested": "v"},
+        "big": 2 ** 70,
+        "keys": {"1": "int key"},
+    }
+    assert event.event_metadata == {"m": 1}
+
+
+def test_json_columns_read_stdlib_documents(data_store):
+    """Checks that documents only the json module accepts are still readable."""
+    with data_store.session.begin() as session:
+        session.execute(
+            sqlalchemy.text("INSERT INTO event (source_type, fingerprint, data) VALUES ('test_type', 'f1', :data)"),
+            {"data": '{"n": NaN, "i": Infinity}'},
+        )
+
+    event = data_store.get_latest_event_with_fingerprint("f1")
+    assert event.data["i"] == float("inf")
+    assert event.data["n"] != event.data["n"]
+
+
+def test_json_columns_write_non_finite_floats(data_store):
+    """Checks that NaN and Infinity are stored as such, and not as null."""
+    data_store.add_record(
+        EventRecord(source_type="test_type", fingerprint="f1", data={"n": float("nan"), "i": float("-inf")})
+    )
+
+    event = data_store.get_latest_event_with_fingerprint("f1")
+    assert event.data["i"] == float("-inf")
+    assert event.data["n"] != event.data["n"]
+
+
+def test_json_columns_reject_datetime(data_store):
+    """Checks that values the json module can not serialize are rejected instead of stored as strings."""
+    with pytest.raises(sqlalchemy.exc.StatementError):
+        data_store.add_record(EventRecord(source_type="test_type", fingerprint="f1", data={"at": datetime(2018, 7, 7)}))
+
+
+@pytest.mark.parametrize("json_impl", ["stdlib", "orjson", "msgspec"])
+def test_json_columns_implementations(data_store, monkeypatch, json_impl):
+    """Checks that each JSON implementation round trips values above 64 bits and reads json module documents."""
+    if json_impl != "stdlib" and (model.orjson is None or (json_impl == "msgspec" and model.msgspec is None)):
+        pytest.skip(f"{json_impl} is not installed")
+    monkeypatch.setattr(model, "_ORJSON", model.orjson if json_impl != "stdlib" else None)
+    monkeypatch.setattr(model, "_MSGSPEC_DECODER", model.msgspec.json.Decoder() if json_impl == "msgspec" else None)
+    data = {"big": 2 ** 70 + 1, "negative": -(2 ** 70) - 1, "keys": {1: "int key"}, "n": [1, 2.5, None]}
+    data_store.add_record(EventRecord(source_type="test_type", fingerprint="f1", data=data))
+
+    assert data_store.get_latest_event_with_fingerprint("f1").data == {
+        "big": 2 ** 70 + 1,
+        "negative": -(2 ** 70) - 1,
+        "keys": {"1": "int key"},
+        "n": [1, 2.5, None],
+    }
+    assert model._json_loads('{"i": Infinity, "big": 18446744073709551617}') == {
+        "i": float("inf"),
+        "big": 2 ** 64 + 1,
+    }
+
+
+def test_json_columns_binary_storage(monkeypatch):
+    """Checks that sqlite stores the JSON documents as bytes when binary storage is selected."""
+    monkeypatch.setattr(model, "JSON_STORAGE", "binary")
+    data_store = DataStore("sqlite://")
+    data_store.add_record(EventRecord(source_type="test_type", fingerprint="f1", data={"näme": [1, None]}))
+
+    with data_store.session.begin() as session:
+        stored = session.execute(sqlalchemy.text("SELECT data FROM event")).scalar_one()
+    assert isinstance(stored, bytes)
+    assert data_store.get_latest_event_with_fingerprint("f1").data == {"näme": [1, None]}
+
+
+def test_add_records(data_store):
+    """Checks that records added in bulk are stored with their ids and defaults."""
+    records = [EventRecord(source_type="test_type", fingerprint=f"f{i}") for i in range(5)]
+    data_store.add_records(records, batch_size=2)
+    data_store.add_records([])
+
+    assert all(record.id for record in records)
+    assert all(record.received_at for record in records)
+    assert data_store.get_latest_event_with_fingerprint("f4").id == records[4].id
+
+
+def test_event_record_flags_default(data_store):
+    """Checks that the processing flags default to False, also for records loaded from the database."""
+    record = EventRecord(source_type="test_type", fingerprint="f1")
+    assert not record.new and not record.owner_email_overridden
+    record.new = True
+    data_store.add_record(record)
+
+    loaded = data_store.get_latest_event_with_fingerprint("f1")
+    assert loaded is not record
+    assert not loaded.new and not loaded.owner_email_overridden
@@ -14,7 +14,9 @@
 
 """Test the fingerprinter utils."""
 
-from comet_core.fingerprint import comet_event_fingerprint
+import pytest
+
+from comet_core.fingerprint import BLACKLISTED, BLAKE2B, ORJSON, comet_event_fingerprint, compile_blacklist, filter_dict
 
 ORIG_DICT = {"a": "b", "b": "c", "res": {"lel": "wahat", "gl": "hf"}}
 
@@ -25,16 +27,61 @@ BLACKLIST = ["a", ["res", "gl"], "lol"]
 AFTER_BLACKLIST_FP = "a4e1f36de415f8ab64da9fd8d76c8bbc"
 
 
-def test_event_fingerprint_no_blacklist():  # pylint: disable=invalid-name,missing-docstring
-    fingerprint = comet_event_fingerprint(ORIG_DICT)
-    assert fingerprint == ORIG_DICT_FP
-
-
-def test_event_fingerprint_blacklist():  # pylint: disable=invalid-name,missing-docstring
-    fingerprint = comet_event_fingerprint(ORIG_DICT, BLACKLIST)
-    assert fingerprint == AFTER_BLACKLIST_FP
+@pytest.mark.parametrize("blacklist,expected", [(None, ORIG_DICT_FP), (BLACKLIST, AFTER_BLACKLIST_FP)])
+def test_event_fingerprint(blacklist, expected):  # pylint: disable=invalid-name,missing-docstring
+    fingerprint = comet_event_fingerprint(ORIG_DICT, blacklist)
+    assert fingerprint == expected
 
 
 def test_event_fingerprint_blacklist_prefix():  # pylint: disable=invalid-name,missing-docstring
     fingerprint = comet_event_fingerprint(ORIG_DICT, BLACKLIST, "test")
     assert fingerprint != AFTER_BLACKLIST_FP
+
+
+def test_event_fingerprint_blake2b():  # pylint: disable=invalid-name,missing-docstring
+    fingerprint = comet_event_fingerprint(ORIG_DICT, BLACKLIST, algorithm=BLAKE2B)
+    assert fingerprint != AFTER_BLACKLIST_FP
+    assert len(fingerprint) == len(AFTER_BLACKLIST_FP)
+    assert fingerprint == comet_event_fingerprint(
+        {"res": {"lel": "wahat"}, "b": "c", "lol": 1}, BLACKLIST, algorithm=BLAKE2B
+    )
+
+
+def test_event_fingerprint_unknown_algorithm():  # pylint: disable=invalid-name,missing-docstring
+    with pytest.raises(ValueError):
+        comet_event_fingerprint(ORIG_DICT, algorithm="md5")
+
+
+def test_event_fingerprint_does_not_modify_data():  # pylint: disable=invalid-name,missing-docstring
+    data = {"a": "b", "b": "c", "res": {"lel": "wahat", "gl": "hf"}, "other": {"gl": "hf"}}
+    fingerprint = comet_event_fingerprint(data, BLACKLIST + [["res", "missing", "key"], ["other", "x"]])
+    assert data == {"a": "b", "b": "c", "res": {"lel": "wahat", "gl": "hf"}, "other": {"gl": "hf"}}
+    assert fingerprint == comet_event_fingerprint({"b": "c", "res": {"lel": "wahat"}, "other": {"gl": "hf"}})
+
+
+def test_compile_blacklist():  # pylint: disable=invalid-name,missing-docstring
+    assert compile_blacklist(BLACKLIST) == {"a": BLACKLISTED, "res": {"gl": BLACKLISTED}, "lol": BLACKLISTED}
+    assert compile_blacklist([["res", "gl"], "res"]) == {"res": BLACKLISTED}
+    assert compile_blacklist(["res", ("res", "gl")]) == {"res": BLACKLISTED}
+
+
+def test_compile_blacklist_is_read_only():  # pylint: disable=invalid-name,missing-docstring
+    with pytest.raises(TypeError):
+        compile_blacklist(BLACKLIST)["res"]["lel"] = BLACKLISTED
+    assert compile_blacklist(BLACKLIST) == {"a": BLACKLISTED, "res": {"gl": BLACKLISTED}, "lol": BLACKLISTED}
+
+
+def test_filter_dict():  # pylint: disable=invalid-name,missing-docstring
+    data = {"a": "b", "b": "c", "res": {"lel": "wahat", "gl": "hf"}, "list": [1]}
+    assert filter_dict(data, BLACKLIST + [["list", "x"]]) is data
+    assert data == {"b": "c", "res": {"lel": "wahat"}, "list": [1]}
+
+
+def test_event_fingerprint_orjson():  # pylint: disable=invalid-name,missing-docstring
+    pytest.importorskip("orjson")
+    fingerprint = comet_event_fingerprint(ORIG_DICT, BLACKLIST, serializer=ORJSON)
+    assert fingerprint != AFTER_BLACKLIST_FP
+    assert fingerprint == comet_event_fingerprint({"res": {"lel": "wahat"}, "b": "c"}, serializer=ORJSON)
+
+    with pytest.raises(ValueError):
+        comet_event_fingerprint(ORIG_DICT, serializer="pickle")